@@ -6,9 +6,15 @@ from .types import (AddressFormat, AddressWidth, BroadcastModes, ConversionMode,
 from .generate_types import ISAExt, ISASet, InstructionCategory, Mnemonic, Register
 from .zydis_types import MaxInstructionLength, MaxOperandCount, MaxCPUFlag, MaxDecoderMode
 from .formatter import Formatter, default_formatter
-from .decoder import Decoder, decode
+from .decoder import (BadBytes, BoundDecoder, Decoder, ResyncPolicy, Superset, decode, decode_arena, decode_batch,
+                      decode_file, superset, sweep)
+from .batch import InstructionBatch
+from .diskcache import DiskCache
+from .classification import MnemonicClass
+from .parallel import parallel_decode
+from .stream import StreamDecoder, adecode, decode_stream
 from .instruction import (AvxMask, AvxBroadcast, InstructionAvx, InstructionMeta, MemoryPointer, MemoryImmediate,
-                          MemoryOperand, Operand, Instruction)
+                          MemoryOperand, Operand, Instruction, InstructionArena)
 
 
 __all__ = ['AddressFormat', 'AddressWidth', 'BroadcastModes', 'ConversionMode', 'CpuFlag', 'CpuFlagAction',
@@ -17,8 +23,11 @@ __all__ = ['AddressFormat', 'AddressWidth', 'BroadcastModes', 'ConversionMode',
            'InstructionAttribute', 'InstructionEncoding', 'LetterCase', 'MachineMode', 'MaskModes', 'MaxCPUFlag',
            'MaxDecoderMode', 'MaxInstructionLength', 'MaxOperandCount', 'MemOpType', 'OpcodeMap', 'OperandAction',
            'OperandEncoding', 'OperandType', 'OperandVisibility', 'RegisterClass', 'RoundingModes', 'Status',
-           'SwizzleModes', 'VectorLength', 'decode', 'default_formatter', 'ISAExt', 'ISASet', 'InstructionCategory',
-           'Mnemonic', 'Decoder', 'Register', 'AvxMask', 'AvxBroadcast', 'InstructionAvx', 'InstructionMeta',
-           'MemoryPointer', 'MemoryImmediate', 'MemoryOperand', 'Operand', 'Instruction']
+           'SwizzleModes', 'VectorLength', 'decode', 'decode_file', 'default_formatter', 'ISAExt', 'ISASet',
+           'InstructionCategory', 'Mnemonic', 'Decoder', 'Register', 'AvxMask', 'AvxBroadcast', 'InstructionAvx',
+           'InstructionMeta', 'MemoryPointer', 'MemoryImmediate', 'MemoryOperand', 'Operand', 'Instruction',
+           'decode_batch', 'InstructionBatch', 'decode_arena', 'InstructionArena', 'parallel_decode', 'adecode',
+           'StreamDecoder', 'decode_stream', 'BadBytes', 'ResyncPolicy', 'sweep', 'Superset', 'superset',
+           'BoundDecoder', 'MnemonicClass', 'DiskCache']
 
 __version__ = '0.3'
@@ -0,0 +1,11 @@
+from .recursive import recursive_disassemble
+from .cfg import ControlFlowGraph, build_cfg
+from .functions import FunctionTable, find_functions
+from .dominators import DominatorTree, LoopForest, dominator_tree, post_dominator_tree, find_loops
+from .callgraph import CallGraph, build_call_graph
+from .xrefs import ReferenceKind, Reference, XrefIndex, build_xrefs, scan_xrefs
+
+
+__all__ = ['recursive_disassemble', 'ControlFlowGraph', 'build_cfg', 'FunctionTable', 'find_functions', 'DominatorTree',
+           'LoopForest', 'dominator_tree', 'post_dominator_tree', 'find_loops', 'CallGraph', 'build_call_graph',
+           'ReferenceKind', 'Reference', 'XrefIndex', 'build_xrefs', 'scan_xrefs']
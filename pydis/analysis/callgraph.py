@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+import typing
+
+from ..generate_types import InstructionCategory
+from ..instruction import Instruction
+from ..batch import InstructionBatch, NoTarget
+from .functions import FunctionTable
+
+
+CallSite = typing.Tuple[int, typing.Optional[int]]
+
+
+def call_sites(instructions: typing.Union[InstructionBatch, typing.Iterable[Instruction]]) -> typing.List[CallSite]:
+    # (address, target) of every call, the target is None for indirect calls.
+    if isinstance(instructions, InstructionBatch):
+        return [(instructions.addresses[index], None if instructions.targets[index] == NoTarget else
+                 instructions.targets[index])
+                for index in range(len(instructions)) if instructions.categories[index] == InstructionCategory.CALL]
+
+    return [(instruction.address, instruction.branch_target) for instruction in instructions
+            if instruction.meta.category == InstructionCategory.CALL]
+
+
+class CallGraph:
+    """
+    Call edges grouped by the function containing the call. Direct edges are stored in sorted arrays twice, once
+    ordered by caller and call site and once by callee, so callers and callees are both a bisect away. Indirect calls
+    are kept as call sites without a target. Replacing the calls of one function only touches its own entries.
+    """
+
+    def __init__(self) -> None:
+        self.functions = array('Q')
+
+        self.callers = array('Q')
+        self.sites = array('Q')
+        self.callees = array('Q')
+
+        self.reverse_callees = array('Q')
+        self.reverse_callers = array('Q')
+        self.reverse_sites = array('Q')
+
+        self.indirect_callers = array('Q')
+        self.indirect_sites = array('Q')
+
+    def __len__(self) -> int:
+        return len(self.callers)
+
+    def __contains__(self, function: int) -> bool:
+        index = bisect_left(self.functions, function)
+        return index < len(self.functions) and self.functions[index] == function
+
+    def set_function(self, function: int,
+                     instructions: typing.Union[InstructionBatch, typing.Iterable[Instruction]]) -> None:
+        # Replaces the edges of function with the calls among instructions, usually the decoded function body.
+        self.set_calls(function, call_sites(instructions))
+
+    def set_calls(self, function: int, calls: typing.Iterable[CallSite]) -> None:
+        self.remove_function(function)
+        insort(self.functions, function)
+
+        calls = sorted(calls, key=lambda call: call[0])
+        direct = [(site, target) for site, target in calls if target is not None]
+        indirect = array('Q', (site for site, target in calls if target is None))
+
+        start = bisect_left(self.callers, function)
+        self.callers[start:start] = array('Q', [function]) * len(direct)
+        self.sites[start:start] = array('Q', (site for site, _ in direct))
+        self.callees[start:start] = array('Q', (target for _, target in direct))
+
+        for site, target in direct:
+            index = self._reverse_index(target, function, site)
+            self.reverse_callees.insert(index, target)
+            self.reverse_callers.insert(index, function)
+            self.reverse_sites.insert(index, site)
+
+        start = bisect_left(self.indirect_callers, function)
+        self.indirect_callers[start:start] = array('Q', [function]) * len(indirect)
+        self.indirect_sites[start:start] = indirect
+
+    def remove_function(self, function: int) -> None:
+        index = bisect_left(self.functions, function)
+        if index == len(self.functions) or self.functions[index] != function:
+            return
+        del self.functions[index]
+
+        start, stop = self._caller_range(function)
+        for position in range(start, stop):
+            index = self._reverse_index(self.callees[position], function, self.sites[position])
+            del self.reverse_callees[index]
+            del self.reverse_callers[index]
+            del self.reverse_sites[index]
+        del self.callers[start:stop]
+        del self.sites[start:stop]
+        del self.callees[start:stop]
+
+        start = bisect_left(self.indirect_callers, function)
+        stop = bisect_right(self.indirect_callers, function, start)
+        del self.indirect_callers[start:stop]
+        del self.indirect_sites[start:stop]
+
+    def callees_of(self, function: int) -> array:
+        # One target per direct call site of function, in call site order.
+        start, stop = self._caller_range(function)
+        return self.callees[start:stop]
+
+    def call_sites_of(self, function: int) -> array:
+        start, stop = self._caller_range(function)
+        return self.sites[start:stop]
+
+    def callers_of(self, function: int) -> array:
+        # One caller per call site targeting function, sorted.
+        start, stop = self._callee_range(function)
+        return self.reverse_callers[start:stop]
+
+    def call_sites_to(self, function: int) -> array:
+        start, stop = self._callee_range(function)
+        return self.reverse_sites[start:stop]
+
+    def indirect_call_sites(self, function: int) -> array:
+        start = bisect_left(self.indirect_callers, function)
+        return self.indirect_sites[start:bisect_right(self.indirect_callers, function, start)]
+
+    def _caller_range(self, function: int) -> typing.Tuple[int, int]:
+        start = bisect_left(self.callers, function)
+        return start, bisect_right(self.callers, function, start)
+
+    def _callee_range(self, function: int) -> typing.Tuple[int, int]:
+        start = bisect_left(self.reverse_callees, function)
+        return start, bisect_right(self.reverse_callees, function, start)
+
+    def _reverse_index(self, callee: int, caller: int, site: int) -> int:
+        # Position of the edge in the callee ordered arrays, which are sorted by callee, caller and call site.
+        start, stop = self._callee_range(callee)
+        start = bisect_left(self.reverse_callers, caller, start, stop)
+        stop = bisect_right(self.reverse_callers, caller, start, stop)
+        return bisect_left(self.reverse_sites, site, start, stop)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self.functions)} functions, {len(self)} calls, ' \
+               f'{len(self.indirect_sites)} indirect calls)'
+
+
+def build_call_graph(instructions: InstructionBatch, functions: FunctionTable) -> CallGraph:
+    # Assigns the calls of a sorted batch to the function table entries containing them. The arrays are filled in
+    # one go instead of inserting function by function.
+    graph = CallGraph()
+    graph.functions.extend(sorted(functions.starts))
+
+    direct = []
+    indirect = []
+    for site, target in call_sites(instructions):
+        index = functions.function_at(site)
+        if index is None:
+            continue
+        if target is None:
+            indirect.append((functions.starts[index], site))
+        else:
+            direct.append((functions.starts[index], site, target))
+
+    direct.sort()
+    graph.callers.extend(caller for caller, _, _ in direct)
+    graph.sites.extend(site for _, site, _ in direct)
+    graph.callees.extend(target for _, _, target in direct)
+
+    direct.sort(key=lambda edge: (edge[2], edge[0], edge[1]))
+    graph.reverse_callees.extend(target for _, _, target in direct)
+    graph.reverse_callers.extend(caller for caller, _, _ in direct)
+    graph.reverse_sites.extend(site for _, site, _ in direct)
+
+    indirect.sort()
+    graph.indirect_callers.extend(caller for caller, _ in indirect)
+    graph.indirect_sites.extend(site for _, site in indirect)
+
+    return graph
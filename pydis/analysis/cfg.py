@@ -0,0 +1,137 @@
+from array import array
+from bisect import bisect_left, bisect_right
+import typing
+
+from ..generate_types import InstructionCategory
+from ..batch import InstructionBatch, NoTarget
+from .recursive import TerminatingCategories, TerminatingMnemonics
+
+
+BranchCategories = frozenset((InstructionCategory.COND_BR, InstructionCategory.UNCOND_BR))
+
+
+def _transpose(offsets: array, values: array) -> typing.Tuple[array, array]:
+    # Reverses the edges of a graph in CSR form with a counting sort, the rows of the result stay sorted.
+    rows = len(offsets) - 1
+    transposed_offsets = array('I', bytes(4 * (rows + 1)))
+    for value in values:
+        transposed_offsets[value + 1] += 1
+    for row in range(rows):
+        transposed_offsets[row + 1] += transposed_offsets[row]
+
+    transposed = array('I', bytes(4 * len(values)))
+    positions = transposed_offsets[:-1]
+    for row in range(rows):
+        for index in range(offsets[row], offsets[row + 1]):
+            value = values[index]
+            transposed[positions[value]] = row
+            positions[value] += 1
+
+    return transposed_offsets, transposed
+
+
+class ControlFlowGraph:
+    """
+    Basic blocks over a batch of instructions sorted by offset. Block b holds the instructions
+    block_starts[b]:block_starts[b + 1] and its edges are stored in CSR form: the successors of b are
+    successors[successor_offsets[b]:successor_offsets[b + 1]] and likewise for predecessors.
+    """
+
+    def __init__(self, instructions: InstructionBatch, block_starts: array, successor_offsets: array,
+                 successors: array, predecessor_offsets: array, predecessors: array) -> None:
+        self.instructions = instructions
+        self.block_starts = block_starts
+        self.block_addresses = array(instructions.addresses.typecode,
+                                     (instructions.addresses[start] for start in block_starts[:-1]))
+        self.successor_offsets = successor_offsets
+        self.successors = successors
+        self.predecessor_offsets = predecessor_offsets
+        self.predecessors = predecessors
+
+    def __len__(self) -> int:
+        return len(self.block_starts) - 1
+
+    def block_instructions(self, block: int) -> range:
+        return range(self.block_starts[block], self.block_starts[block + 1])
+
+    def block_successors(self, block: int) -> array:
+        return self.successors[self.successor_offsets[block]:self.successor_offsets[block + 1]]
+
+    def block_predecessors(self, block: int) -> array:
+        return self.predecessors[self.predecessor_offsets[block]:self.predecessor_offsets[block + 1]]
+
+    def block_at(self, address: int) -> typing.Optional[int]:
+        # The block containing the instruction at address.
+        index = _instruction_index(self.instructions, address)
+        if index is None:
+            return None
+        return bisect_right(self.block_starts, index) - 1
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)} blocks, {len(self.successors)} edges)'
+
+
+def _instruction_index(instructions: InstructionBatch, address: int) -> typing.Optional[int]:
+    index = bisect_left(instructions.addresses, address)
+    if index < len(instructions) and instructions.addresses[index] == address:
+        return index
+    return None
+
+
+def build_cfg(instructions: InstructionBatch) -> ControlFlowGraph:
+    # Blocks end at branches, at instructions that never fall through and before gaps between instructions. Jump,
+    # branch and call targets that land on a decoded instruction start a new block. Calls don't end a block and don't
+    # get an edge, they are left to the call graph.
+    count = len(instructions)
+    offsets = instructions.offsets
+    lengths = instructions.lengths
+    categories = instructions.categories
+    mnemonics = instructions.mnemonics
+    targets = instructions.targets
+
+    leaders = bytearray(count)
+    falls_through = bytearray(count)
+    # The instruction index a branch jumps to, or -1.
+    branch_targets = array('q', [-1]) * count
+
+    for index in range(count):
+        category = categories[index]
+        contiguous = index + 1 < count and offsets[index] + lengths[index] == offsets[index + 1]
+        terminates = category in TerminatingCategories or mnemonics[index] in TerminatingMnemonics
+
+        if targets[index] != NoTarget:
+            target_index = _instruction_index(instructions, targets[index])
+            if target_index is not None:
+                leaders[target_index] = 1
+                if category in BranchCategories:
+                    branch_targets[index] = target_index
+
+        if contiguous and category != InstructionCategory.UNCOND_BR and not terminates:
+            falls_through[index] = 1
+        if index + 1 < count and (category in BranchCategories or terminates or not contiguous):
+            leaders[index + 1] = 1
+
+    if count:
+        leaders[0] = 1
+
+    block_starts = array('I', (index for index in range(count) if leaders[index]))
+    block_starts.append(count)
+
+    successor_offsets = array('I', [0])
+    successors = array('I')
+    for block in range(len(block_starts) - 1):
+        last = block_starts[block + 1] - 1
+        if falls_through[last]:
+            successors.append(block + 1)
+
+        if branch_targets[last] >= 0:
+            target = bisect_right(block_starts, branch_targets[last]) - 1
+            if not (falls_through[last] and target == block + 1):
+                successors.append(target)
+
+        successor_offsets.append(len(successors))
+
+    predecessor_offsets, predecessors = _transpose(successor_offsets, successors)
+
+    return ControlFlowGraph(instructions, block_starts, successor_offsets, successors, predecessor_offsets,
+                            predecessors)
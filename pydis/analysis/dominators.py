@@ -0,0 +1,268 @@
+from array import array
+import typing
+
+from .cfg import ControlFlowGraph
+
+
+def _dominators(count: int, roots: typing.Iterable[int], successor_offsets: array, successors: array,
+                predecessor_offsets: array, predecessors: array) -> typing.Tuple[array, array]:
+    # Cooper, Harvey and Kennedy's iterative algorithm. A virtual node at index count precedes every root so several
+    # roots share one tree, the roots end up as their own immediate dominator and unreachable blocks as -1.
+    virtual = count
+    roots = sorted(set(roots))
+    is_root = bytearray(count)
+    for root in roots:
+        is_root[root] = 1
+
+    # Iterative depth first search for the reverse postorder of the blocks reachable from the roots.
+    postorder = array('I')
+    visited = bytearray(count)
+    for root in roots:
+        if visited[root]:
+            continue
+        visited[root] = 1
+        stack = [(root, successor_offsets[root])]
+        while stack:
+            block, position = stack[-1]
+            if position < successor_offsets[block + 1]:
+                stack[-1] = (block, position + 1)
+                successor = successors[position]
+                if not visited[successor]:
+                    visited[successor] = 1
+                    stack.append((successor, successor_offsets[successor]))
+            else:
+                stack.pop()
+                postorder.append(block)
+
+    order = postorder[::-1]
+    numbers = array('i', [-1]) * (count + 1)
+    numbers[virtual] = 0
+    for number, block in enumerate(order, 1):
+        numbers[block] = number
+
+    idom = array('i', [-1]) * (count + 1)
+    idom[virtual] = virtual
+
+    changed = True
+    while changed:
+        changed = False
+        for block in order:
+            new = virtual if is_root[block] else -1
+            for index in range(predecessor_offsets[block], predecessor_offsets[block + 1]):
+                predecessor = predecessors[index]
+                if idom[predecessor] == -1:
+                    continue
+                if new == -1:
+                    new = predecessor
+                    continue
+
+                first, second = predecessor, new
+                while first != second:
+                    while numbers[first] > numbers[second]:
+                        first = idom[first]
+                    while numbers[second] > numbers[first]:
+                        second = idom[second]
+                new = first
+
+            if idom[block] != new:
+                idom[block] = new
+                changed = True
+
+    for root in roots:
+        if idom[root] == virtual:
+            idom[root] = root
+    idom.pop()
+
+    # A block reachable from two roots is dominated only by the virtual node.
+    for block in order:
+        if idom[block] == virtual:
+            idom[block] = block
+
+    return idom, order
+
+
+class DominatorTree:
+    """
+    Immediate dominators of the blocks of a graph. idom[b] is the immediate dominator of block b, roots dominate
+    themselves and blocks that can't be reached from a root have -1. order holds the reachable blocks in reverse
+    postorder.
+    """
+
+    def __init__(self, idom: array, order: array) -> None:
+        self.idom = idom
+        self.order = order
+
+        # Children in CSR form and preorder intervals, so dominance is an O(1) interval check.
+        count = len(idom)
+        self.child_offsets = array('I', bytes(4 * (count + 1)))
+        for block, parent in enumerate(idom):
+            if parent >= 0 and parent != block:
+                self.child_offsets[parent + 1] += 1
+        for block in range(count):
+            self.child_offsets[block + 1] += self.child_offsets[block]
+
+        self.children = array('I', bytes(4 * self.child_offsets[count]))
+        positions = self.child_offsets[:-1]
+        for block in order:
+            parent = idom[block]
+            if parent != block:
+                self.children[positions[parent]] = block
+                positions[parent] += 1
+
+        self.preorder = array('i', [-1]) * count
+        self.last = array('i', [-1]) * count
+        number = 0
+        for root in order:
+            if idom[root] != root:
+                continue
+            stack = [root]
+            while stack:
+                block = stack.pop()
+                if block < 0:
+                    self.last[~block] = number - 1
+                    continue
+                self.preorder[block] = number
+                number += 1
+                stack.append(~block)
+                stack.extend(self.block_children(block))
+
+    def __len__(self) -> int:
+        return len(self.idom)
+
+    def immediate_dominator(self, block: int) -> typing.Optional[int]:
+        parent = self.idom[block]
+        return None if parent == block or parent < 0 else parent
+
+    def block_children(self, block: int) -> array:
+        return self.children[self.child_offsets[block]:self.child_offsets[block + 1]]
+
+    def dominates(self, dominator: int, block: int) -> bool:
+        # Every block dominates itself.
+        if self.preorder[dominator] < 0 or self.preorder[block] < 0:
+            return False
+        return self.preorder[dominator] <= self.preorder[block] <= self.last[dominator]
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self.order)} of {len(self)} blocks reachable)'
+
+
+def dominator_tree(cfg: ControlFlowGraph, entries: typing.Optional[typing.Iterable[int]] = None) -> DominatorTree:
+    # Without entries every block without predecessors is a root, which covers each function of a whole image.
+    if entries is None:
+        entries = [block for block in range(len(cfg))
+                   if block == 0 or cfg.predecessor_offsets[block] == cfg.predecessor_offsets[block + 1]]
+
+    return DominatorTree(*_dominators(len(cfg), entries, cfg.successor_offsets, cfg.successors,
+                                      cfg.predecessor_offsets, cfg.predecessors))
+
+
+def post_dominator_tree(cfg: ControlFlowGraph, exits: typing.Optional[typing.Iterable[int]] = None) -> DominatorTree:
+    # Without exits every block without successors is a root. Blocks that never reach one, like the body of an
+    # endless loop, have no post-dominator.
+    if exits is None:
+        exits = [block for block in range(len(cfg))
+                 if cfg.successor_offsets[block] == cfg.successor_offsets[block + 1]]
+
+    return DominatorTree(*_dominators(len(cfg), exits, cfg.predecessor_offsets, cfg.predecessors,
+                                      cfg.successor_offsets, cfg.successors))
+
+
+class LoopForest:
+    """
+    Natural loops of a graph and how they nest. Loop l has the header block headers[l] and the enclosing loop
+    parents[l], or -1 for an outermost loop. block_loops[b] is the innermost loop containing block b, or -1.
+    """
+
+    def __init__(self, headers: array, parents: array, block_loops: array) -> None:
+        self.headers = headers
+        self.parents = parents
+        self.block_loops = block_loops
+
+        self.depths = array('I', bytes(4 * len(headers)))
+        # Loops are numbered inner first, so a parent always comes after its children.
+        for loop in reversed(range(len(headers))):
+            if parents[loop] >= 0:
+                self.depths[loop] = self.depths[parents[loop]] + 1
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+    def loop_depth(self, block: int) -> int:
+        # The number of loops containing block.
+        loop = self.block_loops[block]
+        return 0 if loop < 0 else self.depths[loop] + 1
+
+    def contains(self, loop: int, block: int) -> bool:
+        inner = self.block_loops[block]
+        while inner >= 0 and inner != loop:
+            inner = self.parents[inner]
+        return inner == loop
+
+    def loop_blocks(self, loop: int) -> array:
+        return array('I', (block for block in range(len(self.block_loops)) if self.contains(loop, block)))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)} loops)'
+
+
+def find_loops(cfg: ControlFlowGraph, dominators: typing.Optional[DominatorTree] = None) -> LoopForest:
+    # An edge to a block dominating its source closes a natural loop, loops sharing a header are merged. Headers are
+    # handled in reverse of the reverse postorder so inner loops are complete before the loops enclosing them, the
+    # blocks of a finished loop are then represented by its header. Retreating edges of irreducible regions don't
+    # dominate their source and don't form a loop.
+    if dominators is None:
+        dominators = dominator_tree(cfg)
+
+    count = len(cfg)
+    headers = array('I')
+    parents = array('i')
+    block_loops = array('i', [-1]) * count
+    loop_of_header = array('i', [-1]) * count
+    outer = array('I', range(count))
+    marks = array('i', [-1]) * count
+
+    def find(block: int) -> int:
+        root = block
+        while outer[root] != root:
+            root = outer[root]
+        while outer[block] != root:
+            outer[block], block = root, outer[block]
+        return root
+
+    for header in reversed(dominators.order):
+        latches = [predecessor for predecessor in cfg.block_predecessors(header)
+                   if dominators.dominates(header, predecessor)]
+        if not latches:
+            continue
+
+        loop = len(headers)
+        headers.append(header)
+        parents.append(-1)
+        block_loops[header] = loop
+        loop_of_header[header] = loop
+
+        marks[header] = loop
+        body = []
+        worklist = [find(latch) for latch in latches]
+        while worklist:
+            block = worklist.pop()
+            if marks[block] == loop:
+                continue
+            marks[block] = loop
+            body.append(block)
+
+            if block_loops[block] < 0:
+                block_loops[block] = loop
+            elif loop_of_header[block] >= 0 and parents[loop_of_header[block]] < 0:
+                parents[loop_of_header[block]] = loop
+
+            for predecessor in cfg.block_predecessors(block):
+                if dominators.preorder[predecessor] >= 0:
+                    predecessor = find(predecessor)
+                    if marks[predecessor] != loop:
+                        worklist.append(predecessor)
+
+        for block in body:
+            outer[block] = header
+
+    return LoopForest(headers, parents, block_loops)
@@ -0,0 +1,133 @@
+from array import array
+from bisect import bisect_left, bisect_right
+import typing
+
+from ..generate_types import InstructionCategory, Mnemonic
+from ..buffer import BufferLike
+from ..batch import InstructionBatch, NoTarget
+from .recursive import TerminatingCategories, TerminatingMnemonics
+
+
+PaddingCategories = frozenset((InstructionCategory.NOP, InstructionCategory.WIDENOP))
+PaddingMnemonics = frozenset((Mnemonic.INT3,))
+
+# Encodings that commonly open a function: endbr64/endbr32, push rbp/ebp followed by either form of mov rbp, rsp and
+# the stack adjustment of a frameless function.
+Prologues = (b'\xf3\x0f\x1e\xfa', b'\xf3\x0f\x1e\xfb', b'\x55\x48\x89\xe5', b'\x55\x48\x8b\xec', b'\x55\x89\xe5',
+             b'\x55\x8b\xec', b'\x48\x83\xec', b'\x48\x81\xec')
+
+
+class FunctionTable:
+    """
+    Sorted function start addresses with the address just past the last instruction of each function.
+    """
+
+    def __init__(self, starts: array, ends: array) -> None:
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[int, int]]:
+        return zip(self.starts, self.ends)
+
+    def function_at(self, address: int) -> typing.Optional[int]:
+        index = bisect_right(self.starts, address) - 1
+        if index >= 0 and address < self.ends[index]:
+            return index
+        return None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)} functions)'
+
+
+def find_functions(image: BufferLike, instructions: InstructionBatch, address: int = 0,
+                   entry_points: typing.Iterable[int] = ()) -> FunctionTable:
+    # Combines entry points, direct call targets, prologues that follow a function boundary and the targets of jumps
+    # that leave the function they are in or land after the padding behind a ret or jmp (tail calls). instructions
+    # has to be sorted by offset, image is only read to match prologue bytes so nothing is decoded twice. A function
+    # ends at its last instruction before the next start that isn't padding.
+    count = len(instructions)
+    offsets = instructions.offsets
+    lengths = instructions.lengths
+    categories = instructions.categories
+    mnemonics = instructions.mnemonics
+    targets = instructions.targets
+    addresses = instructions.addresses
+    data = memoryview(image).cast('B')
+
+    def index_of(target: int) -> int:
+        index = bisect_left(addresses, target)
+        return index if index < count and addresses[index] == target else -1
+
+    def is_padding(index: int) -> bool:
+        return categories[index] in PaddingCategories or mnemonics[index] in PaddingMnemonics
+
+    def is_terminator(index: int) -> bool:
+        return categories[index] in TerminatingCategories or mnemonics[index] in TerminatingMnemonics
+
+    def follows_boundary(index: int) -> bool:
+        previous = index - 1
+        return index == 0 or offsets[previous] + lengths[previous] != offsets[index] or is_padding(previous) or \
+            is_terminator(previous)
+
+    def follows_padded_terminator(index: int) -> bool:
+        # Padding reached by falling through is usually loop alignment, padding after a ret or jmp separates functions.
+        previous = index - 1
+        if previous < 0 or not is_padding(previous):
+            return False
+        while previous > 0 and is_padding(previous):
+            previous -= 1
+        return is_terminator(previous)
+
+    starts = bytearray(count)
+    for entry_point in entry_points:
+        index = index_of(entry_point)
+        if index >= 0:
+            starts[index] = 1
+
+    for index in range(count):
+        if categories[index] == InstructionCategory.CALL and targets[index] != NoTarget:
+            target = index_of(targets[index])
+            if target >= 0:
+                starts[target] = 1
+
+        if not starts[index] and not is_padding(index) and follows_boundary(index):
+            offset = offsets[index]
+            if any(data[offset:offset + len(prologue)] == prologue for prologue in Prologues):
+                starts[index] = 1
+
+    # Tail calls only show up once the surrounding function bounds are known and each new start shrinks a function,
+    # so repeat until nothing changes.
+    changed = True
+    while changed:
+        changed = False
+        start_indices = [index for index in range(count) if starts[index]]
+
+        for position, start in enumerate(start_indices):
+            stop = start_indices[position + 1] if position + 1 < len(start_indices) else count
+            for index in range(start, stop):
+                if categories[index] != InstructionCategory.UNCOND_BR or targets[index] == NoTarget:
+                    continue
+
+                target = index_of(targets[index])
+                if target < 0 or starts[target]:
+                    continue
+
+                if (not (start <= target < stop) and follows_boundary(target)) or follows_padded_terminator(target):
+                    starts[target] = 1
+                    changed = True
+
+    function_starts = array(addresses.typecode)
+    function_ends = array(addresses.typecode)
+    start_indices = [index for index in range(count) if starts[index]]
+    for position, start in enumerate(start_indices):
+        last = (start_indices[position + 1] if position + 1 < len(start_indices) else count) - 1
+        while last > start and is_padding(last):
+            last -= 1
+
+        function_starts.append(addresses[start])
+        function_ends.append(addresses[last] + lengths[last])
+
+    return FunctionTable(function_starts, function_ends)
@@ -0,0 +1,149 @@
+from ctypes import addressof, memmove
+from multiprocessing import Pool
+from multiprocessing.sharedctypes import RawArray
+from queue import Queue
+import typing
+
+from ..types import MachineMode, AddressWidth, DecoderMode, Status
+from ..generate_types import InstructionCategory, Mnemonic
+from ..zydis_types import Instruction as RawInstruction
+from ..interface import DecoderDecodeBufferInto
+from ..buffer import Buffer, BufferLike
+from ..batch import InstructionBatch, NoTarget
+from ..decoder import Decoder
+
+
+# Execution never falls through to the next instruction after one of these.
+TerminatingCategories = frozenset((InstructionCategory.UNCOND_BR, InstructionCategory.RET))
+TerminatingMnemonics = frozenset((Mnemonic.HLT, Mnemonic.UD0, Mnemonic.UD1, Mnemonic.UD2))
+
+# How many frontier targets are handed to a worker at once and how many instructions it decodes before handing the
+# rest of its work back to be shared with the other workers.
+TraversalTaskSize = 64
+TraversalTaskBudget = 4096
+
+VisitedMap = typing.Union[bytearray, typing.Any]
+
+_success = int(Status.Success)
+
+
+def _traverse(decoder: Decoder, base: int, length: int, address: int, visited: VisitedMap, worklist: typing.List[int],
+              batch: InstructionBatch, limit: typing.Optional[int] = None) -> typing.List[int]:
+    # Decodes along every path in worklist, appending to batch, until limit instructions have been decoded. The
+    # visited map holds one byte per byte of the image which is set once an instruction has been decoded starting at
+    # that byte. Returns what is left of the worklist.
+    instruction = RawInstruction()
+    decode = DecoderDecodeBufferInto(decoder._decoder, instruction)
+
+    while worklist and (limit is None or len(batch) < limit):
+        buffer_offset = worklist.pop()
+
+        while buffer_offset < length and not visited[buffer_offset]:
+            visited[buffer_offset] = 1
+
+            if decode(base + buffer_offset, length - buffer_offset, address + buffer_offset) != _success:
+                break
+
+            batch.append(instruction, buffer_offset)
+
+            target = batch.targets[-1]
+            if target != NoTarget and 0 <= target - address < length:
+                worklist.append(target - address)
+
+            if instruction.meta.category in TerminatingCategories or instruction.mnemonic in TerminatingMnemonics:
+                break
+
+            buffer_offset += instruction.length
+
+    return worklist
+
+
+_worker_state: typing.Optional[tuple] = None
+
+
+def _initialize_worker(image: RawArray, visited: RawArray, address: int, mode: MachineMode,
+                       address_width: AddressWidth, modes: typing.Dict[DecoderMode, bool]) -> None:
+    global _worker_state
+    decoder = Decoder(mode, address_width)
+    for decoder_mode, enabled in modes.items():
+        decoder.set_mode(decoder_mode, enabled)
+
+    _worker_state = (decoder, image, visited, address)
+
+
+def _traverse_task(offsets: typing.List[int]) -> typing.Tuple[InstructionBatch, typing.List[int]]:
+    decoder, image, visited, address = _worker_state
+    batch = InstructionBatch()
+
+    frontier = _traverse(decoder, addressof(image), len(image), address, visited, list(offsets), batch,
+                         TraversalTaskBudget)
+
+    return batch, frontier
+
+
+def _parallel_traverse(buf: Buffer, entry_offsets: typing.List[int], address: int, workers: int,
+                       decoder: Decoder) -> InstructionBatch:
+    # The image and visited map live in shared memory. Each offset has its own byte in the visited map so a worker
+    # never overwrites another's marks, but checking and setting it isn't atomic so occasionally two workers decode
+    # the same start, the duplicates are dropped when the batches are merged. Every worker pulls tasks from the pool's
+    # shared queue, an idle worker picks up whatever part of the frontier is pending. The shared arrays can only be
+    # handed to the workers when they start, multiprocessing.Pool takes an initializer on every supported Python.
+    image = RawArray('B', buf.length)
+    memmove(image, buf.address, buf.length)
+    visited = RawArray('B', buf.length)
+
+    batches = []
+    frontier = list(entry_offsets)
+    pending = 0
+    completed = Queue()
+
+    with Pool(workers, _initialize_worker, (image, visited, address, MachineMode(decoder._decoder.machineMode),
+                                            AddressWidth(decoder._decoder.addressWidth),
+                                            {mode: decoder.is_mode_enabled(mode) for mode in DecoderMode})) as pool:
+        while frontier or pending:
+            # Spread the frontier over the free slots so a small frontier still keeps every worker busy.
+            while frontier and pending < workers * 2:
+                size = min(TraversalTaskSize, -(-len(frontier) // (workers * 2 - pending)))
+                task, frontier = frontier[:size], frontier[size:]
+                pool.apply_async(_traverse_task, (task,), callback=completed.put, error_callback=completed.put)
+                pending += 1
+
+            result = completed.get()
+            pending -= 1
+            if isinstance(result, BaseException):
+                raise result
+
+            batch, remaining = result
+            batches.append(batch)
+            frontier.extend(offset for offset in remaining if not visited[offset])
+
+    merged = InstructionBatch()
+    for batch in batches:
+        merged.extend(batch)
+
+    return merged
+
+
+def recursive_disassemble(image: BufferLike, entry_points: typing.Iterable[int], address: int = 0,
+                          mode: MachineMode = MachineMode.Long64, address_width: AddressWidth = AddressWidth.Width64,
+                          decoder: typing.Optional[Decoder] = None, workers: int = 1) -> InstructionBatch:
+    # Follows the control flow from each entry point, address is the address of the first byte of image. Relative
+    # branch and call targets inside the image are queued, decoding along a path stops at an instruction that never
+    # falls through, at an undecodable byte or where an earlier path already decoded. The result is sorted by offset
+    # and is the same whether or not the traversal is spread over worker processes.
+    with Buffer(image) as buf:
+        entry_offsets = []
+        for entry_point in entry_points:
+            if not (0 <= entry_point - address < buf.length):
+                raise IndexError("entry point out of range")
+            entry_offsets.append(entry_point - address)
+
+        decoder = decoder or Decoder(mode, address_width)
+        if workers > 1:
+            batch = _parallel_traverse(buf, entry_offsets, address, workers, decoder)
+        else:
+            batch = InstructionBatch()
+            visited = bytearray(buf.length)
+            _traverse(decoder, buf.address, buf.length, address, visited, entry_offsets, batch)
+
+    return batch.sorted(unique=True)
@@ -0,0 +1,150 @@
+from array import array
+from bisect import bisect_left
+from enum import IntEnum
+import typing
+
+from ..types import MachineMode, AddressWidth, OperandType, OperandAction, MemOpType, Status
+from ..generate_types import InstructionCategory, Register
+from ..zydis_types import Instruction as RawInstruction
+from ..interface import DecoderDecodeBufferInto
+from ..buffer import Buffer, BufferLike
+from ..instruction import Instruction, relative_address_mask
+from ..decoder import Decoder
+
+
+_success = int(Status.Success)
+
+
+class ReferenceKind(IntEnum):
+    Call = 0
+    Jump = 1
+    ConditionalJump = 2
+    Read = 3
+    Write = 4
+    AddressTaken = 5
+
+
+class Reference(typing.NamedTuple):
+    source: int
+    target: int
+    kind: ReferenceKind
+
+
+BranchKinds = {InstructionCategory.CALL: ReferenceKind.Call,
+               InstructionCategory.UNCOND_BR: ReferenceKind.Jump,
+               InstructionCategory.COND_BR: ReferenceKind.ConditionalJump}
+
+ReadActions = frozenset((OperandAction.Read, OperandAction.ReadWrite, OperandAction.Cond_Read,
+                         OperandAction.Read_Cond_Write, OperandAction.Write_Cond_Read))
+WriteActions = frozenset((OperandAction.Write, OperandAction.ReadWrite, OperandAction.Cond_Write,
+                          OperandAction.Read_Cond_Write, OperandAction.Write_Cond_Read))
+
+
+def instruction_references(instruction: RawInstruction) -> typing.List[typing.Tuple[int, ReferenceKind]]:
+    # The absolute addresses referenced by relative immediates and instruction pointer based memory operands, worked
+    # out the way ZydisCalcAbsoluteAddress does without a call per operand.
+    references = []
+    next_address = instruction.instructionAddress + instruction.length
+
+    for operand in instruction.operands[:instruction.operandCount]:
+        if operand.type == OperandType.Immediate and operand.imm.isRelative:
+            kind = BranchKinds.get(instruction.meta.category, ReferenceKind.AddressTaken)
+            references.append(((next_address + operand.imm.value.s) & relative_address_mask(instruction), kind))
+
+        elif operand.type == OperandType.Memory and operand.mem.base in (Register.RIP, Register.EIP):
+            mask = 0xFFFFFFFFFFFFFFFF if operand.mem.base == Register.RIP else 0xFFFFFFFF
+            target = (next_address + operand.mem.disp.value) & mask
+
+            if operand.mem.type != MemOpType.Mem:
+                references.append((target, ReferenceKind.AddressTaken))
+                continue
+            if operand.action in ReadActions:
+                references.append((target, ReferenceKind.Read))
+            if operand.action in WriteActions:
+                references.append((target, ReferenceKind.Write))
+
+    return references
+
+
+class XrefIndex:
+    """
+    Cross references sorted by target address, then source address. Each reference is stored as one entry in the
+    parallel targets, sources and kinds arrays so the references to an address or a range are a bisect away.
+    """
+
+    def __init__(self, targets: array, sources: array, kinds: array) -> None:
+        self.targets = targets
+        self.sources = sources
+        self.kinds = kinds
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def __iter__(self) -> typing.Iterator[Reference]:
+        return self._references(0, len(self))
+
+    def references_to(self, address: int) -> typing.List[Reference]:
+        return list(self.references_between(address, address + 1))
+
+    def references_between(self, start: int, stop: int) -> typing.Iterator[Reference]:
+        # References to any address in [start, stop), for example every access into a data structure.
+        return self._references(bisect_left(self.targets, start), bisect_left(self.targets, stop))
+
+    def _references(self, start: int, stop: int) -> typing.Iterator[Reference]:
+        for index in range(start, stop):
+            yield Reference(self.sources[index], self.targets[index], ReferenceKind(self.kinds[index]))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)} references)'
+
+
+def build_xrefs(instructions: typing.Iterable[typing.Union[Instruction, RawInstruction]]) -> XrefIndex:
+    # Accepts the output of Decoder.decode and friends as well as raw instructions.
+    references = []
+    for instruction in instructions:
+        raw = instruction.underlying_type if isinstance(instruction, Instruction) else instruction
+        source = raw.instructionAddress
+        references.extend((target, source, kind) for target, kind in instruction_references(raw))
+
+    return _index(references)
+
+
+def scan_xrefs(image: BufferLike, address: int = 0, offsets: typing.Optional[typing.Iterable[int]] = None,
+               mode: MachineMode = MachineMode.Long64, address_width: AddressWidth = AddressWidth.Width64,
+               decoder: typing.Optional[Decoder] = None) -> XrefIndex:
+    # Decodes into a single reused instruction. With offsets, for example the offsets of a batch returned by
+    # recursive_disassemble, only the instructions there are decoded, otherwise image is swept skipping bytes that
+    # don't decode.
+    decoder = decoder or Decoder(mode, address_width)
+    instruction = RawInstruction()
+    decode_into = DecoderDecodeBufferInto(decoder._decoder, instruction)
+    references = []
+
+    with Buffer(image) as buf:
+        def decode(buffer_offset: int) -> bool:
+            status = decode_into(buf.address + buffer_offset, buf.length - buffer_offset, address + buffer_offset)
+            if status != _success:
+                return False
+
+            source = address + buffer_offset
+            references.extend((target, source, kind) for target, kind in instruction_references(instruction))
+            return True
+
+        if offsets is not None:
+            for buffer_offset in offsets:
+                if not (0 <= buffer_offset < buf.length):
+                    raise IndexError("offset out of range")
+                decode(buffer_offset)
+        else:
+            buffer_offset = 0
+            while buffer_offset < buf.length:
+                buffer_offset += instruction.length if decode(buffer_offset) else 1
+
+    return _index(references)
+
+
+def _index(references: typing.List[typing.Tuple[int, int, ReferenceKind]]) -> XrefIndex:
+    references.sort()
+    return XrefIndex(array('Q', (target for target, _, _ in references)),
+                     array('Q', (source for _, source, _ in references)),
+                     array('B', (kind for _, _, kind in references)))
@@ -0,0 +1,97 @@
+from array import array
+from ctypes import c_uint8, c_uint64
+import typing
+
+from .types import InstructionAttribute
+from .zydis_types import Instruction as RawInstruction, InstructionMeta as RawInstructionMeta
+from .instruction import relative_target
+from .classification import instruction_classes
+
+
+_instruction_fields = dict(RawInstruction._fields_)
+_meta_fields = dict(RawInstructionMeta._fields_)
+
+# Each column uses the same C type as the Zydis field it is copied from, classes holds MnemonicClass flags.
+BatchColumns = (('offsets', c_uint64),
+                ('lengths', _instruction_fields['length']),
+                ('mnemonics', _instruction_fields['mnemonic']),
+                ('categories', _meta_fields['category']),
+                ('encodings', _instruction_fields['encoding']),
+                ('operand_counts', _instruction_fields['operandCount']),
+                ('attributes', _instruction_fields['attributes']),
+                ('addresses', _instruction_fields['instructionAddress']),
+                ('targets', _instruction_fields['instructionAddress']),
+                ('classes', c_uint8))
+
+# Marks an instruction without a relative branch target in the targets column.
+NoTarget = 0xFFFFFFFFFFFFFFFF
+
+_relative = int(InstructionAttribute.Is_Relative)
+
+
+class InstructionBatch:
+    """
+    Struct-of-arrays view of a sequence of decoded instructions. Every column is an array.array with one entry per
+    instruction, offsets are relative to the start of the decoded buffer and targets hold the absolute address of a
+    relative branch or NoTarget.
+    """
+
+    def __init__(self) -> None:
+        for name, ctype in BatchColumns:
+            setattr(self, name, array(ctype._type_))
+
+    def append(self, instruction: RawInstruction, offset: int) -> None:
+        # Every field is read once and compared as a plain int, this runs once per decoded instruction.
+        mnemonic = instruction.mnemonic
+        attributes = instruction.attributes
+
+        self.offsets.append(offset)
+        self.lengths.append(instruction.length)
+        self.mnemonics.append(mnemonic)
+        self.categories.append(instruction.meta.category)
+        self.encodings.append(instruction.encoding)
+        self.operand_counts.append(instruction.operandCount)
+        self.attributes.append(attributes)
+        self.addresses.append(instruction.instructionAddress)
+
+        target = relative_target(instruction) if attributes & _relative else None
+        self.targets.append(NoTarget if target is None else target)
+        self.classes.append(instruction_classes(mnemonic, attributes))
+
+    def extend(self, other: 'InstructionBatch', start: int = 0) -> None:
+        for name, _ in BatchColumns:
+            getattr(self, name).extend(getattr(other, name)[start:])
+
+    def take(self, indices: typing.Iterable[int]) -> 'InstructionBatch':
+        indices = list(indices)
+        batch = InstructionBatch()
+        for name, _ in BatchColumns:
+            column = getattr(self, name)
+            getattr(batch, name).extend([column[index] for index in indices])
+
+        return batch
+
+    def sorted(self, unique: bool = False) -> 'InstructionBatch':
+        # With unique only the first of several instructions decoded at the same offset is kept.
+        offsets = self.offsets
+        indices = sorted(range(len(self)), key=offsets.__getitem__)
+        if unique:
+            indices = [index for position, index in enumerate(indices)
+                       if position == 0 or offsets[indices[position - 1]] != offsets[index]]
+
+        return self.take(indices)
+
+    def columns(self) -> typing.Dict[str, array]:
+        return {name: getattr(self, name) for name, _ in BatchColumns}
+
+    def to_numpy(self) -> typing.Dict[str, typing.Any]:
+        # numpy is optional, the views share memory with the arrays so the batch can't grow while they are alive.
+        import numpy
+
+        return {name: numpy.frombuffer(getattr(self, name), dtype=numpy.dtype(ctype)) for name, ctype in BatchColumns}
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)} instructions)'
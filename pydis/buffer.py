@@ -0,0 +1,64 @@
+from array import array
+from ctypes import (Structure, PYFUNCTYPE, POINTER, pythonapi, py_object, byref, c_void_p, c_ssize_t, c_int,
+                    c_char_p)
+from mmap import mmap
+import typing
+
+
+BufferLike = typing.Union[bytes, bytearray, memoryview, mmap, array]
+
+PyBUF_SIMPLE = 0
+
+
+class PyBuffer(Structure):
+    _fields_ = [('buf', c_void_p),
+                ('obj', c_void_p),
+                ('len', c_ssize_t),
+                ('itemsize', c_ssize_t),
+                ('readonly', c_int),
+                ('ndim', c_int),
+                ('format', c_char_p),
+                ('shape', POINTER(c_ssize_t)),
+                ('strides', POINTER(c_ssize_t)),
+                ('suboffsets', POINTER(c_ssize_t)),
+                ('internal', c_void_p)]
+
+
+# Separate prototypes so the argtypes of the shared ctypes.pythonapi functions are left untouched.
+_PyObject_GetBuffer = PYFUNCTYPE(c_int, py_object, POINTER(PyBuffer), c_int)(('PyObject_GetBuffer', pythonapi))
+_PyBuffer_Release = PYFUNCTYPE(None, POINTER(PyBuffer))(('PyBuffer_Release', pythonapi))
+
+
+class Buffer:
+    """
+    Pins the memory of any object exposing the buffer protocol so it can be handed to Zydis without a copy. The
+    exporting object can't be resized or closed until the buffer is released.
+    """
+
+    def __init__(self, obj: BufferLike) -> None:
+        self._view = PyBuffer()
+        _PyObject_GetBuffer(obj, byref(self._view), PyBUF_SIMPLE)
+
+        self.address = self._view.buf or 0
+        self.length = self._view.len
+
+    @property
+    def released(self) -> bool:
+        return self._view is None
+
+    def release(self) -> None:
+        if self._view is not None:
+            _PyBuffer_Release(byref(self._view))
+            self._view = None
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __enter__(self) -> 'Buffer':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    def __del__(self) -> None:
+        self.release()
@@ -0,0 +1,51 @@
+from collections import OrderedDict
+import typing
+
+
+class LRUCache:
+    """
+    Mapping that holds at most capacity entries and evicts the least recently used one first. Every operation is a
+    single OrderedDict call so it can be shared between threads without a lock, a hit racing with the eviction of the
+    same entry only loses the recency update. hits and misses are counted by the owner, since one logical lookup can
+    take several probes.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: typing.Hashable) -> typing.Any:
+        value = self._entries.get(key)
+        if value is not None:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                pass
+        return value
+
+    def put(self, key: typing.Hashable, value: typing.Any) -> None:
+        self._entries[key] = value
+        try:
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        except KeyError:
+            pass
+
+    def clear(self) -> None:
+        # Drops the entries, the counters keep counting.
+        self._entries.clear()
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)}/{self.capacity} entries, {self.hits} hits, {self.misses} misses)'
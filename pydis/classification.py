@@ -0,0 +1,70 @@
+from enum import IntFlag
+
+from .types import InstructionAttribute
+from .generate_types import Mnemonic
+
+
+class MnemonicClass(IntFlag):
+    Branch = 0x01
+    Call = 0x02
+    Ret = 0x04
+    ''' A branch that is only taken depending on flags or a counter register. '''
+    Conditional = 0x08
+    UnconditionalJump = 0x10
+    Nop = 0x20
+    ''' Requires ring 0. Privileged forms of otherwise unprivileged mnemonics, like mov to a control register, are only
+        known from the Is_Priviledged attribute of a decoded instruction. '''
+    Privileged = 0x40
+
+
+CallMnemonics = frozenset((Mnemonic.CALL,))
+ReturnMnemonics = frozenset((Mnemonic.RET, Mnemonic.IRET, Mnemonic.IRETD, Mnemonic.IRETQ, Mnemonic.SYSRET,
+                             Mnemonic.SYSEXIT))
+UnconditionalJumpMnemonics = frozenset((Mnemonic.JMP,))
+ConditionalJumpMnemonics = frozenset((Mnemonic.JB, Mnemonic.JBE, Mnemonic.JCXZ, Mnemonic.JECXZ, Mnemonic.JRCXZ,
+                                      Mnemonic.JKNZD, Mnemonic.JKZD, Mnemonic.JL, Mnemonic.JLE, Mnemonic.JNB,
+                                      Mnemonic.JNBE, Mnemonic.JNL, Mnemonic.JNLE, Mnemonic.JNO, Mnemonic.JNP,
+                                      Mnemonic.JNS, Mnemonic.JNZ, Mnemonic.JO, Mnemonic.JP, Mnemonic.JS, Mnemonic.JZ,
+                                      Mnemonic.LOOP, Mnemonic.LOOPE, Mnemonic.LOOPNE))
+NopMnemonics = frozenset((Mnemonic.NOP, Mnemonic.FNOP))
+PrivilegedMnemonics = frozenset((Mnemonic.CLAC, Mnemonic.CLGI, Mnemonic.CLTS, Mnemonic.HLT, Mnemonic.INVD,
+                                 Mnemonic.INVEPT, Mnemonic.INVLPG, Mnemonic.INVLPGA, Mnemonic.INVPCID,
+                                 Mnemonic.INVVPID, Mnemonic.LGDT, Mnemonic.LIDT, Mnemonic.LLDT, Mnemonic.LMSW,
+                                 Mnemonic.LTR, Mnemonic.MONITOR, Mnemonic.MWAIT, Mnemonic.RDMSR, Mnemonic.SKINIT,
+                                 Mnemonic.STAC, Mnemonic.STGI, Mnemonic.SWAPGS, Mnemonic.SYSEXIT, Mnemonic.SYSRET,
+                                 Mnemonic.VMCLEAR, Mnemonic.VMLAUNCH, Mnemonic.VMLOAD, Mnemonic.VMPTRLD,
+                                 Mnemonic.VMPTRST, Mnemonic.VMREAD, Mnemonic.VMRESUME, Mnemonic.VMRUN,
+                                 Mnemonic.VMSAVE, Mnemonic.VMWRITE, Mnemonic.VMXOFF, Mnemonic.VMXON, Mnemonic.WBINVD,
+                                 Mnemonic.WRMSR, Mnemonic.XRSTORS, Mnemonic.XRSTORS64, Mnemonic.XSAVES,
+                                 Mnemonic.XSAVES64, Mnemonic.XSETBV))
+
+
+def _build_table() -> bytes:
+    table = bytearray(max(Mnemonic) + 1)
+    for mnemonics, classes in ((CallMnemonics, MnemonicClass.Branch | MnemonicClass.Call),
+                               (ReturnMnemonics, MnemonicClass.Branch | MnemonicClass.Ret),
+                               (UnconditionalJumpMnemonics, MnemonicClass.Branch | MnemonicClass.UnconditionalJump),
+                               (ConditionalJumpMnemonics, MnemonicClass.Branch | MnemonicClass.Conditional),
+                               (NopMnemonics, MnemonicClass.Nop),
+                               (PrivilegedMnemonics, MnemonicClass.Privileged)):
+        for mnemonic in mnemonics:
+            table[mnemonic] |= classes
+
+    return bytes(table)
+
+
+# The MnemonicClass flags of every mnemonic, indexed by its value.
+MnemonicClasses = _build_table()
+
+
+_privileged = int(MnemonicClass.Privileged)
+_privileged_attribute = int(InstructionAttribute.Is_Priviledged)
+
+
+def instruction_classes(mnemonic: int, attributes: int) -> int:
+    # The table entry for mnemonic, with Privileged added for instructions Zydis marks as privileged. Plain ints keep
+    # this cheap enough for the decode loops.
+    classes = MnemonicClasses[mnemonic]
+    if attributes & _privileged_attribute:
+        classes |= _privileged
+    return classes
@@ -1,21 +1,146 @@
-from ctypes import create_string_buffer, byref
-
+from array import array
+from ctypes import addressof, memmove, sizeof, string_at, c_uint64
+from enum import IntEnum
+from functools import partial
+from itertools import cycle, repeat
+import mmap
+import os
 import typing
 
 from .types import MachineMode, AddressWidth, Status, DecoderMode
-from .zydis_types import MaxInstructionLength
-from .interface import DecoderInit, DecoderDecodeBuffer, DecoderEnableMode
-from .instruction import Instruction
+from .zydis_types import MaxInstructionLength, Decoder as RawDecoder, Instruction as RawInstruction
+from .interface import DecoderInit, DecoderDecodeBuffer, DecoderDecodeBufferInto, DecoderEnableMode
+from .instruction import Instruction, InstructionArena, relative_address_mask
+from .buffer import Buffer, BufferLike
+from .batch import InstructionBatch, BatchColumns, NoTarget
+from .threads import thread_map
+from .cache import LRUCache
+from .diskcache import DiskCache
+
+
+# How far the sweep of a mapped file advances before the pages behind it are released.
+FileSweepWindow = 16 * 1024 * 1024
+
+# Rough memory footprint of one decode cache entry: the instruction structure, its key and the bookkeeping around it.
+DecodeCacheEntrySize = sizeof(RawInstruction) + 256
+
+# Default number of instructions a bound decoder memoizes.
+BoundMemoSize = 4096
+
+# Bytes decode_backward looks at beyond the instructions it returns, chains starting there get a chance to
+# resynchronize before they reach the instructions that matter.
+BackwardSyncLength = 64
+
+_success = int(Status.Success)
+
+
+def _madvise(mapping: mmap.mmap, option: str, start: int = 0, length: int = 0) -> None:
+    # madvise is only available on unix with python >= 3.8, without it the mapping is still correct just not tuned.
+    option = getattr(mmap, option, None)
+    if option is not None and hasattr(mapping, 'madvise'):
+        mapping.madvise(option, start, length)
+
+
+def _instruction_pool(pool_size: int) -> typing.Iterator[typing.Optional[RawInstruction]]:
+    # The structures to decode into one after the other. With a pool the instructions share a ring of structures, each
+    # one is only valid until pool_size more instructions have been decoded, without one every instruction gets a new
+    # structure.
+    if not pool_size:
+        return repeat(None)
+    return cycle([RawInstruction() for _ in range(pool_size)])
+
+
+class ResyncPolicy(IntEnum):
+    ''' Resume at the byte following the one that failed to decode. '''
+    NextByte = 0
+
+    ''' Resume at the next address that is a multiple of the sweep's alignment. '''
+    NextAligned = 1
+
+
+class BadBytes(typing.NamedTuple):
+    offset: int
+    address: int
+    length: int
+    status: Status
+
+
+ResyncFunction = typing.Callable[[int, Status], int]
+
+
+class Superset(typing.NamedTuple):
+    ''' One entry per byte offset, lengths and mnemonics are 0 and targets NoTarget where nothing decodes. '''
+    lengths: array
+    mnemonics: array
+    valid: array
+    targets: array
 
 
 class Decoder:
-    def __init__(self, mode: MachineMode = MachineMode.Long64,
-                 address_width: AddressWidth = AddressWidth.Width64) -> None:
+    def __init__(self, mode: MachineMode = MachineMode.Long64, address_width: AddressWidth = AddressWidth.Width64,
+                 cache_size: int = 0, disk_cache: typing.Optional[DiskCache] = None) -> None:
         status, self._decoder = DecoderInit(mode, address_width)
 
         if status != Status.Success:
             raise Exception(f'Failed to initialize the decoder: {status.name}')
 
+        # Optional cache of decoded instructions keyed by their bytes, cache_size is its memory budget in bytes. It is
+        # emptied whenever a mode changes.
+        if 0 < cache_size < DecodeCacheEntrySize:
+            raise ValueError(f'cache_size is smaller than one cache entry ({DecodeCacheEntrySize} bytes)')
+        self.cache = LRUCache(cache_size // DecodeCacheEntrySize) if cache_size else None
+        # The length of the instruction last cached for each prefix of up to three bytes, enough for the opcode and
+        # ModRM byte that mostly decide the length. A lookup only probes the cache for that one length.
+        self._cache_lengths = {}
+        self._update_modes()
+        # Optional on-disk cache of decode_batch results.
+        self.disk_cache = disk_cache
+
+    def _decode_buffer(self, pointer: int, length: int, address: int,
+                       instruction: typing.Optional[RawInstruction] = None) -> typing.Tuple[Status, RawInstruction]:
+        # DecoderDecodeBuffer going through the cache. Decoding never looks past the end of an instruction, so if the
+        # bytes at pointer start with a cached instruction that's what they decode to. Zydis keeps relative operands
+        # as displacements, so patching the address is all it takes to move a cached instruction.
+        cache = self.cache
+        if cache is None or length <= 0:
+            return DecoderDecodeBuffer(self._decoder, pointer, length, address, instruction)
+
+        window = string_at(pointer, min(length, MaxInstructionLength))
+        prefix = window[:3]
+        size = self._cache_lengths.get(prefix)
+        if size is not None:
+            cached = cache.get(window[:size])
+            if cached is not None:
+                cache.hits += 1
+                if instruction is None:
+                    instruction = RawInstruction.from_buffer_copy(cached)
+                else:
+                    memmove(addressof(instruction), cached, len(cached))
+                instruction.instructionAddress = address
+                return Status.Success, instruction
+
+        cache.misses += 1
+        status, instruction = DecoderDecodeBuffer(self._decoder, pointer, length, address, instruction)
+        if status == Status.Success:
+            size = instruction.length
+            cache.put(window[:size], bytes(instruction))
+            self._cache_lengths[prefix] = size
+
+        return status, instruction
+
+    def _decode_function(self) -> typing.Callable[..., typing.Tuple[Status, RawInstruction]]:
+        # DecoderDecodeBuffer bound to this decoder, or _decode_buffer when there is a cache to go through.
+        if self.cache is None:
+            return partial(DecoderDecodeBuffer, self._decoder)
+        return self._decode_buffer
+
+    def _decode_into(self, instruction: RawInstruction) -> typing.Callable[[int, int, int], int]:
+        # Like DecoderDecodeBufferInto, going through the cache if there is one.
+        if self.cache is None:
+            return DecoderDecodeBufferInto(self._decoder, instruction)
+
+        return lambda pointer, length, address: self._decode_buffer(pointer, length, address, instruction)[0]
+
     @property
     def minimal(self) -> bool:
         return self.is_mode_enabled(DecoderMode.Minimal)
@@ -32,32 +157,358 @@ class Decoder:
         if status != Status.Success:
             raise Exception(f'Failed to set mode: {status.name}')
 
-    def decode_instruction(self, buffer: bytes, address: int = 0,
-                           buffer_offset: int = 0) -> Instruction:
-        if not (0 <= buffer_offset < len(buffer)):
-            raise IndexError("offset out of range")
+        self._update_modes()
 
-        length = max(len(buffer) - buffer_offset, MaxInstructionLength)
-        buf = create_string_buffer(buffer[buffer_offset:buffer_offset + length], length)
+    def _copy(self) -> 'Decoder':
+        # Same configuration, with its own Zydis decoder and cache.
+        cache_size = self.cache.capacity * DecodeCacheEntrySize if self.cache is not None else 0
+        decoder = Decoder(MachineMode(self._decoder.machineMode), AddressWidth(self._decoder.addressWidth), cache_size,
+                          self.disk_cache)
+        decoder._decoder = RawDecoder.from_buffer_copy(self._decoder)
+        decoder._update_modes()
+        return decoder
 
-        status, instruction = DecoderDecodeBuffer(self._decoder, buf, length, address)
+    def _update_modes(self) -> None:
+        # The cached instructions were decoded with the old modes. Scans that only need instruction boundaries decode
+        # with a copy that has minimal decoding enabled, switching modes on this decoder would race with other threads
+        # using it.
+        if self.cache is not None:
+            self.cache.clear()
+        self._cache_lengths.clear()
+        self._minimal_decoder = RawDecoder.from_buffer_copy(self._decoder)
+        DecoderEnableMode(self._minimal_decoder, DecoderMode.Minimal, True)
+
+    def bind(self, buffer: BufferLike, base_address: int = 0, memo_size: int = BoundMemoSize) -> 'BoundDecoder':
+        return BoundDecoder(self, buffer, base_address, memo_size)
+
+    def decode_instruction(self, buffer: BufferLike, address: int = 0,
+                           buffer_offset: int = 0) -> Instruction:
+        with Buffer(buffer) as buf:
+            if not (0 <= buffer_offset < buf.length):
+                raise IndexError("offset out of range")
+
+            length = min(buf.length - buffer_offset, MaxInstructionLength)
+            status, instruction = self._decode_buffer(buf.address + buffer_offset, length, address)
 
         if status != Status.Success:
             raise Exception(f'Failed while decoding: {status.name}')
 
         return Instruction(instruction)
 
-    def decode(self, buffer: bytes, address: int = 0,
-               buffer_offset: int = 0) -> typing.Generator[Instruction, None, None]:
-        if not (0 <= buffer_offset < len(buffer)):
-            raise IndexError("offset out of range")
+    def decode_into(self, raw_instruction: RawInstruction, buffer: BufferLike, buffer_offset: int = 0,
+                    address: int = 0) -> Instruction:
+        with Buffer(buffer) as buf:
+            if not (0 <= buffer_offset < buf.length):
+                raise IndexError("offset out of range")
+
+            length = min(buf.length - buffer_offset, MaxInstructionLength)
+            status, _ = self._decode_buffer(buf.address + buffer_offset, length, address, raw_instruction)
+
+        if status != Status.Success:
+            raise Exception(f'Failed while decoding: {status.name}')
+
+        return Instruction(raw_instruction)
+
+    def decode(self, buffer: BufferLike, address: int = 0, buffer_offset: int = 0,
+               pool_size: int = 0) -> typing.Generator[Instruction, None, None]:
+        with Buffer(buffer) as buf:
+            if not (0 <= buffer_offset < buf.length):
+                raise IndexError("offset out of range")
+
+            yield from self._decode_range(buf.address, buf.length, address, buffer_offset, pool_size)
+
+    def decode_many(self, buffers: typing.Iterable[typing.Tuple[BufferLike, int]],
+                    threads: typing.Optional[int] = None) -> typing.List[typing.List[Instruction]]:
+        # Every thread decodes with its own copy of this decoder.
+        def make_function() -> typing.Callable[[typing.Tuple[BufferLike, int]], typing.List[Instruction]]:
+            decoder = self._copy()
+            return lambda item: list(decoder.decode(*item))
+
+        return thread_map(make_function, list(buffers), threads)
+
+    def _decode_available(self, buffer: BufferLike, address: int,
+                          final: bool) -> typing.Tuple[typing.List[Instruction], int]:
+        # Decodes every complete instruction in buffer and returns them with the number of bytes they span. Unless
+        # final is set an instruction cut off by the end of the buffer is left for the caller to retry with more data.
+        instructions = []
+
+        decode = self._decode_function()
+        with Buffer(buffer) as buf:
+            buffer_offset = 0
+            status = Status.NoMoreData
+            while buffer_offset < buf.length:
+                status, instruction = decode(buf.address + buffer_offset, buf.length - buffer_offset,
+                                             address + buffer_offset)
+                if status != Status.Success:
+                    break
+
+                instructions.append(Instruction(instruction))
+                buffer_offset += instruction.length
+
+        if status not in (Status.Success, Status.NoMoreData):
+            raise Exception(f'Failed while decoding: {status.name}')
+
+        if final:
+            buffer_offset = buf.length
+
+        return instructions, buffer_offset
+
+    def decode_batch(self, buffer: BufferLike, address: int = 0,
+                     max_count: typing.Optional[int] = None) -> InstructionBatch:
+        if self.disk_cache is not None:
+            key = self.disk_cache.key(buffer, address, bytes(self._decoder), max_count)
+            batch = self.disk_cache.load(key)
+            if batch is not None:
+                return batch
+
+        batch = InstructionBatch()
+
+        with Buffer(buffer) as buf:
+            status, _ = self._decode_batch_range(batch, buf.address, buf.length, address, 0, buf.length, max_count)
+
+        if status not in (Status.Success, Status.NoMoreData):
+            raise Exception(f'Failed while decoding: {status.name}')
+
+        if self.disk_cache is not None:
+            self.disk_cache.store(key, batch)
+        return batch
+
+    def _decode_batch_range(self, batch: InstructionBatch, base: int, length: int, address: int, buffer_offset: int,
+                            stop: int, max_count: typing.Optional[int] = None) -> typing.Tuple[Status, int]:
+        # Sweeps until an instruction starts at or after stop, returns the status that ended the sweep along with the
+        # offset it stopped at. Success means the sweep ran up to stop or max_count.
+        instruction = RawInstruction()
+        status = _success
+        decode = self._decode_into(instruction)
+        append = batch.append
+
+        while buffer_offset < stop and (max_count is None or len(batch) < max_count):
+            status = decode(base + buffer_offset, length - buffer_offset, address + buffer_offset)
+            if status != _success:
+                break
+
+            append(instruction, buffer_offset)
+            buffer_offset += instruction.length
+
+        return Status(status), buffer_offset
+
+    def decode_arena(self, buffer: BufferLike, address: int = 0,
+                     max_count: typing.Optional[int] = None) -> InstructionArena:
+        with Buffer(buffer) as buf:
+            # Every instruction is at least one byte long which bounds the arena, start with a guess at the average
+            # instruction length and grow geometrically from there.
+            limit = buf.length if max_count is None else min(max_count, buf.length)
+            arena = (RawInstruction * max(min(limit, buf.length // 4), 1))()
+
+            decode = self._decode_function()
+            count = 0
+            buffer_offset = 0
+            while count < limit:
+                if count == len(arena):
+                    grown = (RawInstruction * min(count * 2, limit))()
+                    memmove(grown, arena, sizeof(arena))
+                    arena = grown
+
+                status, instruction = decode(buf.address + buffer_offset, buf.length - buffer_offset,
+                                             address + buffer_offset, arena[count])
+                if status != Status.Success:
+                    break
+
+                count += 1
+                buffer_offset += instruction.length
+            else:
+                status = Status.NoMoreData
+
+        if status != Status.NoMoreData:
+            raise Exception(f'Failed while decoding: {status.name}')
+
+        return InstructionArena(arena, range(count))
 
-        length = len(buffer)
-        buf = create_string_buffer(buffer, length)
+    def scan_lengths(self, buffer: BufferLike, address: int = 0) -> typing.Tuple[array, array]:
+        offsets = array(c_uint64._type_)
+        lengths = array('B')
+        instruction = RawInstruction()
+
+        # Only instruction boundaries are needed so semantic decoding is skipped.
+        decode = DecoderDecodeBufferInto(self._minimal_decoder, instruction)
+        with Buffer(buffer) as buf:
+            buffer_offset = 0
+            while True:
+                status = decode(buf.address + buffer_offset, buf.length - buffer_offset, address + buffer_offset)
+                if status != _success:
+                    break
+
+                offsets.append(buffer_offset)
+                lengths.append(instruction.length)
+                buffer_offset += instruction.length
+
+        if status != Status.NoMoreData:
+            raise Exception(f'Failed while decoding: {Status(status).name}')
+
+        return offsets, lengths
+
+    def superset(self, buffer: BufferLike, address: int = 0) -> Superset:
+        # Decodes at every byte offset rather than only where the previous instruction ends, so overlapping and
+        # misaligned instructions show up as well.
+        with Buffer(buffer) as buf:
+            return self._superset_range(buf.address, buf.length, address)
+
+    def _superset_range(self, base: int, length: int, address: int) -> Superset:
+        # Minimal decoding is enough, the relative branch target comes from the raw immediate.
+        columns = dict(BatchColumns)
+        instruction = RawInstruction()
+
+        lengths = array('B', bytes(length))
+        mnemonics = array(columns['mnemonics']._type_, [0]) * length
+        valid = array('B', bytes(length))
+        targets = array(columns['targets']._type_, [NoTarget]) * length
+
+        decode = DecoderDecodeBufferInto(self._minimal_decoder, instruction)
+        immediate = instruction.raw.imm[0]
+        for buffer_offset in range(length):
+            if decode(base + buffer_offset, length - buffer_offset, address + buffer_offset) != _success:
+                continue
+
+            lengths[buffer_offset] = instruction.length
+            mnemonics[buffer_offset] = instruction.mnemonic
+            valid[buffer_offset] = 1
+            if immediate.isRelative:
+                targets[buffer_offset] = (address + buffer_offset + instruction.length + immediate.value.s) & \
+                    relative_address_mask(instruction)
+
+        return Superset(lengths, mnemonics, valid, targets)
+
+    def decode_backward(self, buffer: BufferLike, address: int, target: int,
+                        count: int = 1) -> typing.List[Instruction]:
+        # Up to count instructions, in order, the last of which ends right before target. address is the address of the
+        # first byte of buffer. Every offset in a window before target is decoded once, the chains of instructions
+        # starting there that end exactly at target then vote on the boundaries: decoding resynchronizes quickly, so
+        # the boundaries most chains pass through are the likely ones.
+        with Buffer(buffer) as buf:
+            end = target - address
+            if not (0 <= end <= buf.length):
+                raise IndexError("target out of range")
+
+            start = max(0, end - count * MaxInstructionLength - BackwardSyncLength)
+            size = end - start
+            # The window ends at target so no instruction in it can cross target.
+            lengths = self._superset_range(buf.address + start, size, address + start).lengths
+
+            reaches = bytearray(size + 1)
+            reaches[size] = 1
+            for offset in reversed(range(size)):
+                if lengths[offset] and reaches[offset + lengths[offset]]:
+                    reaches[offset] = 1
+
+            votes = array('I', bytes(4 * (size + 1)))
+            for offset in range(size):
+                if reaches[offset]:
+                    votes[offset] += 1
+                    votes[offset + lengths[offset]] += votes[offset]
+
+            offsets = []
+            position = size
+            while len(offsets) < count:
+                candidates = [offset for offset in range(max(0, position - MaxInstructionLength), position)
+                              if reaches[offset] and offset + lengths[offset] == position]
+                if not candidates:
+                    break
+
+                position = max(candidates, key=lambda offset: (votes[offset], -offset))
+                offsets.append(position)
+
+            instructions = []
+            for offset in reversed(offsets):
+                status, instruction = self._decode_buffer(buf.address + start + offset, lengths[offset],
+                                                          address + start + offset)
+                if status != Status.Success:
+                    raise Exception(f'Failed while decoding: {status.name}')
+                instructions.append(Instruction(instruction))
+
+        return instructions
+
+    def decode_file(self, path: typing.Union[str, os.PathLike], offset: int = 0, length: typing.Optional[int] = None,
+                    address: int = 0, pool_size: int = 0) -> typing.Generator[Instruction, None, None]:
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if length is None:
+                length = size - offset
+
+            if not (0 <= offset < size and 0 < length <= size - offset):
+                raise IndexError("offset out of range")
+
+            # The mapping has to start on an allocation boundary so decoding starts part way into it.
+            start = offset - offset % mmap.ALLOCATIONGRANULARITY
+            with mmap.mmap(file.fileno(), offset - start + length, access=mmap.ACCESS_READ, offset=start) as mapping:
+                _madvise(mapping, 'MADV_SEQUENTIAL')
+
+                with Buffer(mapping) as buf:
+                    buffer_offset = offset - start
+                    swept = buffer_offset - buffer_offset % mmap.PAGESIZE
+                    for instruction in self._decode_range(buf.address, buf.length, address, buffer_offset,
+                                                          pool_size):
+                        yield instruction
+
+                        buffer_offset += instruction.length
+                        if buffer_offset - swept >= FileSweepWindow:
+                            # Instructions own a copy of their bytes so the pages that were swept can be dropped.
+                            release = buffer_offset - buffer_offset % mmap.PAGESIZE
+                            _madvise(mapping, 'MADV_DONTNEED', swept, release - swept)
+                            swept = release
+
+    def sweep(self, buffer: BufferLike, address: int = 0, buffer_offset: int = 0,
+              resync: typing.Union[ResyncPolicy, ResyncFunction] = ResyncPolicy.NextByte, alignment: int = 1,
+              pool_size: int = 0) -> typing.Generator[typing.Union[Instruction, BadBytes], None, None]:
+        # An error tolerant decode. Bytes that don't decode are reported as BadBytes, consecutive failures are merged
+        # into one entry carrying the status of the first failure. After a failure decoding resumes at the offset
+        # chosen by resync, a function is called with the failing offset and status and returns the next offset.
+        base_address = address - buffer_offset
+        if resync == ResyncPolicy.NextByte:
+            resync = lambda offset, _: offset + 1
+        elif resync == ResyncPolicy.NextAligned:
+            if alignment < 1:
+                raise ValueError("alignment must be positive")
+            resync = lambda offset, _: offset + alignment - (base_address + offset) % alignment
+
+        pool = _instruction_pool(pool_size)
+        decode = self._decode_function()
+
+        with Buffer(buffer) as buf:
+            if not (0 <= buffer_offset < buf.length):
+                raise IndexError("offset out of range")
+
+            bad_offset = None
+            bad_status = None
+
+            while buffer_offset < buf.length:
+                status, instruction = decode(buf.address + buffer_offset, buf.length - buffer_offset,
+                                             base_address + buffer_offset, next(pool))
+
+                if status != Status.Success:
+                    if bad_offset is None:
+                        bad_offset = buffer_offset
+                        bad_status = status
+
+                    buffer_offset = min(max(resync(buffer_offset, status), buffer_offset + 1), buf.length)
+                    continue
+
+                if bad_offset is not None:
+                    yield BadBytes(bad_offset, base_address + bad_offset, buffer_offset - bad_offset, bad_status)
+                    bad_offset = None
+
+                buffer_offset += instruction.length
+                yield Instruction(instruction)
+
+            if bad_offset is not None:
+                yield BadBytes(bad_offset, base_address + bad_offset, buffer_offset - bad_offset, bad_status)
+
+    def _decode_range(self, base: int, length: int, address: int, buffer_offset: int,
+                      pool_size: int = 0) -> typing.Generator[Instruction, None, None]:
+        pool = _instruction_pool(pool_size)
+        decode = self._decode_function()
 
         while True:
-            status, instruction = DecoderDecodeBuffer(self._decoder, byref(buf, buffer_offset),
-                                                      length - buffer_offset, address)
+            status, instruction = decode(base + buffer_offset, length - buffer_offset, address, next(pool))
 
             if status != Status.Success:
                 break
@@ -71,8 +522,104 @@ class Decoder:
             raise Exception(f'Failed while decoding: {status.name}')
 
 
-def decode(buffer, address: int = 0, mode: MachineMode = MachineMode.Long64,
+class BoundDecoder:
+    """
+    Random access decoding of a single buffer whose first byte is at base_address. The buffer is pinned until the
+    bound decoder is closed and the instructions looked up are memoized per offset in a bounded cache.
+    """
+
+    def __init__(self, decoder: Decoder, buffer: BufferLike, base_address: int = 0,
+                 memo_size: int = BoundMemoSize) -> None:
+        self.decoder = decoder
+        self.base_address = base_address
+        self.memo = LRUCache(memo_size)
+        self._buffer = Buffer(buffer)
+
+    def at(self, address: int) -> Instruction:
+        return self.at_offset(address - self.base_address)
+
+    def at_offset(self, buffer_offset: int) -> Instruction:
+        buf = self._buffer
+        if buf.released:
+            raise ValueError("bound decoder is closed")
+        if not (0 <= buffer_offset < buf.length):
+            raise IndexError("offset out of range")
+
+        instruction = self.memo.get(buffer_offset)
+        if instruction is not None:
+            self.memo.hits += 1
+            return instruction
+
+        self.memo.misses += 1
+        status, raw_instruction = self.decoder._decode_buffer(buf.address + buffer_offset,
+                                                              min(buf.length - buffer_offset, MaxInstructionLength),
+                                                              self.base_address + buffer_offset)
+        if status != Status.Success:
+            raise Exception(f'Failed while decoding: {status.name}')
+
+        instruction = Instruction(raw_instruction)
+        self.memo.put(buffer_offset, instruction)
+        return instruction
+
+    def close(self) -> None:
+        self.memo.clear()
+        self._buffer.release()
+
+    def __len__(self) -> int:
+        return self._buffer.length
+
+    def __enter__(self) -> 'BoundDecoder':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self._buffer.length} bytes at {self.base_address:#x})'
+
+
+def decode(buffer: BufferLike, address: int = 0, mode: MachineMode = MachineMode.Long64,
            address_width: AddressWidth = AddressWidth.Width64) -> typing.Generator[Instruction, None, None]:
     decoder = Decoder(mode, address_width)
 
     return decoder.decode(buffer, address)
+
+
+def sweep(buffer: BufferLike, address: int = 0,
+          resync: typing.Union[ResyncPolicy, ResyncFunction] = ResyncPolicy.NextByte, alignment: int = 1,
+          mode: MachineMode = MachineMode.Long64, address_width: AddressWidth = AddressWidth.Width64)\
+        -> typing.Generator[typing.Union[Instruction, BadBytes], None, None]:
+    decoder = Decoder(mode, address_width)
+
+    return decoder.sweep(buffer, address, resync=resync, alignment=alignment)
+
+
+def superset(buffer: BufferLike, address: int = 0, mode: MachineMode = MachineMode.Long64,
+             address_width: AddressWidth = AddressWidth.Width64) -> Superset:
+    decoder = Decoder(mode, address_width)
+
+    return decoder.superset(buffer, address)
+
+
+def decode_batch(buffer: BufferLike, address: int = 0, max_count: typing.Optional[int] = None,
+                 mode: MachineMode = MachineMode.Long64, address_width: AddressWidth = AddressWidth.Width64,
+                 disk_cache: typing.Optional[DiskCache] = None) -> InstructionBatch:
+    decoder = Decoder(mode, address_width, disk_cache=disk_cache)
+
+    return decoder.decode_batch(buffer, address, max_count)
+
+
+def decode_arena(buffer: BufferLike, address: int = 0, max_count: typing.Optional[int] = None,
+                 mode: MachineMode = MachineMode.Long64,
+                 address_width: AddressWidth = AddressWidth.Width64) -> InstructionArena:
+    decoder = Decoder(mode, address_width)
+
+    return decoder.decode_arena(buffer, address, max_count)
+
+
+def decode_file(path: typing.Union[str, os.PathLike], offset: int = 0, length: typing.Optional[int] = None,
+                address: int = 0, mode: MachineMode = MachineMode.Long64,
+                address_width: AddressWidth = AddressWidth.Width64) -> typing.Generator[Instruction, None, None]:
+    decoder = Decoder(mode, address_width)
+
+    return decoder.decode_file(path, offset, length, address)
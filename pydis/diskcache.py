@@ -0,0 +1,151 @@
+import hashlib
+import os
+import struct
+import tempfile
+import typing
+from ctypes import sizeof
+
+from .buffer import BufferLike
+from .batch import InstructionBatch, BatchColumns
+
+
+# Default byte budget of a disk cache.
+DefaultDiskCacheSize = 1024 * 1024 * 1024
+
+DiskCacheSuffix = '.batch'
+
+# Stores between full scans of the directory, which pick up entries written or removed by other processes.
+DiskCacheScanInterval = 1024
+
+# Part of every key so entries written with another column layout are never read back.
+_layout = ','.join(f'{name}:{ctype._type_}' for name, ctype in BatchColumns).encode('ascii')
+_header = struct.Struct('<Q')
+_entry_size = sum(sizeof(ctype) for _, ctype in BatchColumns)
+
+
+class DiskCache:
+    """
+    Decoded batches stored as one file per entry in directory, keyed by a sha256 over the input bytes, the base
+    address and the decoder configuration. Reading an entry refreshes its modification time and once the entries
+    take more than max_bytes the least recently used ones are deleted. Several processes can share a directory,
+    entries are written to a temporary file first and renamed into place. The total size is tracked in memory and
+    the directory is only scanned when it goes over budget or every DiskCacheScanInterval stores.
+    """
+
+    def __init__(self, directory: typing.Union[str, os.PathLike], max_bytes: int = DefaultDiskCacheSize) -> None:
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._stores = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(buffer: BufferLike, address: int, configuration: bytes, max_count: typing.Optional[int] = None) -> str:
+        # configuration identifies how the bytes were decoded, for a Decoder that's its machine mode, address width
+        # and decoder modes.
+        digest = hashlib.sha256(_layout)
+        digest.update(struct.pack('<Qq', address, -1 if max_count is None else max_count))
+        digest.update(configuration)
+        with memoryview(buffer) as view, view.cast('B') as data:
+            digest.update(data)
+        return digest.hexdigest()
+
+    def load(self, key: str) -> typing.Optional[InstructionBatch]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted by another process since it was read.
+            pass
+
+        count, = _header.unpack_from(data) if len(data) >= _header.size else (-1,)
+        if len(data) != _header.size + count * _entry_size:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        offset = _header.size
+
+        batch = InstructionBatch()
+        for name, _ in BatchColumns:
+            column = getattr(batch, name)
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            offset += size
+
+        return batch
+
+    def store(self, key: str, batch: InstructionBatch) -> None:
+        descriptor, temporary = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(_header.pack(len(batch)))
+                for name, _ in BatchColumns:
+                    getattr(batch, name).tofile(file)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        # Replacing an existing entry counts it twice, that only makes the next scan come earlier.
+        self._stores += 1
+        if self._size is not None and self._stores % DiskCacheScanInterval:
+            self._size += _header.size + len(batch) * _entry_size
+        else:
+            self._size = None
+        if self._size is None or self._size > self.max_bytes:
+            self._evict()
+
+    def clear(self) -> None:
+        for entry, _ in self._entries():
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+        self._size = None
+
+    def size(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + DiskCacheSuffix)
+
+    def _entries(self) -> typing.List[typing.Tuple[os.DirEntry, os.stat_result]]:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(DiskCacheSuffix):
+                try:
+                    entries.append((entry, entry.stat()))
+                except FileNotFoundError:
+                    pass
+        return entries
+
+    def _evict(self) -> None:
+        # Scans the directory, deletes the oldest entries until they fit in max_bytes and resets the tracked size.
+        entries = self._entries()
+        total = sum(stat.st_size for _, stat in entries)
+
+        if total > self.max_bytes:
+            entries.sort(key=lambda item: item[1].st_mtime_ns)
+            for entry, stat in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+                total -= stat.st_size
+
+        self._size = total
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.directory!r}, {self.hits} hits, {self.misses} misses)'
@@ -1,25 +1,68 @@
+from ctypes import addressof, sizeof, string_at
+import typing
+
 from .types import (Status, FormatterStyle, FormatterProperty, LetterCase, AddressFormat, DisplacementFormat,
-                    ImmediateFormat)
+                    ImmediateFormat, InstructionAttribute)
 from .interface import FormatterInit, FormatterSetProperty, FormatterFormatInstruction, FormatterFormatOperand
-from .zydis_types import Instruction
+from .zydis_types import Instruction, Formatter as RawFormatter
+from .threads import thread_map
+from .cache import LRUCache
+
+
+# Rough memory footprint of one format cache entry: the key, the formatted text and the bookkeeping around them.
+FormatCacheEntrySize = sizeof(Instruction) + 256
+
+_address_offset = Instruction.instructionAddress.offset
+_address_end = _address_offset + Instruction.instructionAddress.size
+_relative = int(InstructionAttribute.Is_Relative)
 
 
 class Formatter:
-    def __init__(self, style: FormatterStyle = FormatterStyle.Intel) -> None:
+    def __init__(self, style: FormatterStyle = FormatterStyle.Intel, cache_size: int = 0) -> None:
         status, formatter = FormatterInit(style)
 
         if status != Status.Success:
             raise Exception(f'Failed to initialize the decoder: {status.name}')
 
         self._formatter = formatter
+        # Optional cache of formatted instructions, cache_size is its memory budget in bytes. It is emptied whenever a
+        # property changes.
+        self.cache = LRUCache(cache_size // FormatCacheEntrySize) if cache_size else None
 
     def format_instruction(self, instruction: Instruction) -> str:
+        cache = self.cache
+        if cache is not None:
+            # The key is the whole decoded instruction except for its address, decoder modes change the decoding of
+            # the same bytes. Relative operands are printed as absolute addresses so those instructions need their
+            # address in the key as well.
+            data = string_at(addressof(instruction), sizeof(Instruction))
+            key = (data[:_address_offset], data[_address_end:],
+                   instruction.instructionAddress if instruction.attributes & _relative else None)
+            string = cache.get(key)
+            if string is not None:
+                cache.hits += 1
+                return string
+            cache.misses += 1
+
         status, string = FormatterFormatInstruction(self._formatter, instruction)
         if status != Status.Success:
             raise Exception(f'Failed to format instruction: {status.name}')
 
+        if cache is not None:
+            cache.put(key, string)
         return string
 
+    def format_many(self, instructions: typing.Iterable[Instruction],
+                    threads: typing.Optional[int] = None) -> typing.List[str]:
+        # Every thread formats with its own copy of this formatter.
+        return thread_map(lambda: self._copy().format_instruction, list(instructions), threads)
+
+    def _copy(self) -> 'Formatter':
+        # Same properties, with its own Zydis formatter and cache.
+        formatter = Formatter(cache_size=self.cache.capacity * FormatCacheEntrySize if self.cache is not None else 0)
+        formatter._formatter = RawFormatter.from_buffer_copy(self._formatter)
+        return formatter
+
     def format_operand(self, instruction: Instruction, operand_index: int) -> str:
         status, string = FormatterFormatOperand(self._formatter, instruction, operand_index)
         if status != Status.Success:
@@ -27,13 +70,18 @@ class Formatter:
 
         return string
 
+    def _set_property(self, property: FormatterProperty, value: int) -> None:
+        FormatterSetProperty(self._formatter, property, value)
+        if self.cache is not None:
+            self.cache.clear()
+
     @property
     def uppercase_letters(self) -> bool:
         return self._formatter.letterCase == LetterCase.Upper
 
     @uppercase_letters.setter
     def uppercase_letters(self, uppercase: bool) -> None:
-        FormatterSetProperty(self._formatter, FormatterProperty.Uppercase, uppercase)
+        self._set_property(FormatterProperty.Uppercase, uppercase)
 
     @property
     def uppercase_hex(self) -> bool:
@@ -41,7 +89,7 @@ class Formatter:
 
     @uppercase_hex.setter
     def uppercase_hex(self, uppercase: bool) -> None:
-        FormatterSetProperty(self._formatter, FormatterProperty.Hex_Uppercase, uppercase)
+        self._set_property(FormatterProperty.Hex_Uppercase, uppercase)
 
     @property
     def print_segment_registers(self) -> bool:
@@ -49,7 +97,7 @@ class Formatter:
 
     @print_segment_registers.setter
     def print_segment_registers(self, print_segment_register: bool) -> None:
-        FormatterSetProperty(self._formatter, FormatterProperty.MemSeg, print_segment_register)
+        self._set_property(FormatterProperty.MemSeg, print_segment_register)
 
     @property
     def print_operand_sizes(self) -> bool:
@@ -57,7 +105,7 @@ class Formatter:
 
     @print_operand_sizes.setter
     def print_operand_sizes(self, print_operand_size: bool) -> None:
-        FormatterSetProperty(self._formatter, FormatterProperty.MemSize, print_operand_size)
+        self._set_property(FormatterProperty.MemSize, print_operand_size)
 
     @property
     def address_format(self) -> AddressFormat:
@@ -65,7 +113,7 @@ class Formatter:
 
     @address_format.setter
     def address_format(self, format: AddressFormat) -> None:
-        FormatterSetProperty(self._formatter, FormatterProperty.Address_Format, format)
+        self._set_property(FormatterProperty.Address_Format, format)
 
     @property
     def displacement_format(self) -> DisplacementFormat:
@@ -73,7 +121,7 @@ class Formatter:
 
     @displacement_format.setter
     def displacement_format(self, format: DisplacementFormat) -> None:
-        FormatterSetProperty(self._formatter, FormatterProperty.Displacement_Format, format)
+        self._set_property(FormatterProperty.Displacement_Format, format)
 
     @property
     def immediate_format(self) -> ImmediateFormat:
@@ -81,7 +129,7 @@ class Formatter:
 
     @immediate_format.setter
     def immediate_format(self, format: ImmediateFormat) -> None:
-        FormatterSetProperty(self._formatter, FormatterProperty.Immediate_Format, format)
+        self._set_property(FormatterProperty.Immediate_Format, format)
 
 
 default_formatter: Formatter = Formatter()
@@ -1,3 +1,5 @@
+from collections.abc import Sequence
+from ctypes import Array
 import typing
 
 from .types import (MachineMode, OperandType, OperandVisibility, OperandAction, OperandEncoding, ElementTypes,
@@ -9,6 +11,41 @@ from .zydis_types import (Instruction as RawInstruction, Operand as RawOperand,
 from .interface import MnemonicGetString, RegisterGetString, RegisterGetClass, RegisterGetId, CalcAbsoluteAddress
 from .generate_types import Register as RegisterEnum, InstructionCategory, ISAExt, ISASet, Mnemonic
 from .formatter import Formatter, default_formatter
+from .classification import MnemonicClass, MnemonicClasses, instruction_classes
+
+
+_relative = int(InstructionAttribute.Is_Relative)
+_immediate = int(OperandType.Immediate)
+
+
+def relative_target(instruction: RawInstruction) -> typing.Optional[int]:
+    # The absolute address of a relative immediate (jump, call and loop targets), wrapped the same way as the
+    # instruction pointer. Checking the attribute first keeps this cheap for the majority of instructions that don't
+    # have one.
+    if not instruction.attributes & _relative:
+        return None
+
+    if not instruction.operandCount:
+        # Minimal decoding skips the operands, the raw immediate is still there.
+        for immediate in instruction.raw.imm:
+            if immediate.isRelative:
+                return (instruction.instructionAddress + instruction.length + immediate.value.s) & \
+                    relative_address_mask(instruction)
+        return None
+
+    for operand in instruction.operands[:instruction.operandCount]:
+        if operand.type == _immediate and operand.imm.isRelative:
+            status, address = CalcAbsoluteAddress(instruction, operand)
+            return address & relative_address_mask(instruction) if status == Status.Success else None
+
+    return None
+
+
+def relative_address_mask(instruction: RawInstruction) -> int:
+    # Relative addresses wrap around at the instruction pointer width, 16 bit operands truncate it outside long mode.
+    if instruction.machineMode == MachineMode.Long64:
+        return 0xFFFFFFFFFFFFFFFF
+    return 0xFFFF if instruction.operandWidth == 16 else 0xFFFFFFFF
 
 
 class Register(int):
@@ -376,10 +413,47 @@ class Instruction:
     def attributes(self) -> InstructionAttribute:
         return InstructionAttribute(self._instruction.attributes)
 
+    @property
+    def branch_target(self) -> typing.Optional[int]:
+        return relative_target(self._instruction)
+
     @property
     def address(self) -> int:
         return self._instruction.instructionAddress
 
+    @property
+    def classes(self) -> MnemonicClass:
+        return MnemonicClass(instruction_classes(self._instruction.mnemonic, self._instruction.attributes))
+
+    @property
+    def is_branch(self) -> bool:
+        return bool(MnemonicClasses[self._instruction.mnemonic] & MnemonicClass.Branch)
+
+    @property
+    def is_call(self) -> bool:
+        return bool(MnemonicClasses[self._instruction.mnemonic] & MnemonicClass.Call)
+
+    @property
+    def is_ret(self) -> bool:
+        return bool(MnemonicClasses[self._instruction.mnemonic] & MnemonicClass.Ret)
+
+    @property
+    def is_conditional(self) -> bool:
+        return bool(MnemonicClasses[self._instruction.mnemonic] & MnemonicClass.Conditional)
+
+    @property
+    def is_unconditional_jump(self) -> bool:
+        return bool(MnemonicClasses[self._instruction.mnemonic] & MnemonicClass.UnconditionalJump)
+
+    @property
+    def is_nop(self) -> bool:
+        return bool(MnemonicClasses[self._instruction.mnemonic] & MnemonicClass.Nop)
+
+    @property
+    def is_privileged(self) -> bool:
+        return bool(instruction_classes(self._instruction.mnemonic, self._instruction.attributes) &
+                    MnemonicClass.Privileged)
+
     # TODO double check functionality of this property
     @property
     def accessed_flags(self) -> [CpuFlag]:
@@ -411,3 +485,35 @@ class Instruction:
     # TODO consider if more information should be added to the string
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}({self.mnemonic})'
+
+
+class InstructionArena(Sequence):
+    """
+    A sequence of instructions stored back to back in one native array. Instruction wrappers are only created when an
+    element is accessed and they reference the arena's memory instead of owning a copy.
+    """
+
+    def __init__(self, arena: Array, indices: typing.Optional[range] = None) -> None:
+        self._arena = arena
+        self._indices = indices if indices is not None else range(len(arena))
+
+    def __getitem__(self, index: typing.Union[int, slice]) -> typing.Union[Instruction, 'InstructionArena']:
+        if isinstance(index, slice):
+            return InstructionArena(self._arena, self._indices[index])
+
+        return Instruction(self._arena[self._indices[index]])
+
+    def __iter__(self) -> typing.Iterator[Instruction]:
+        arena = self._arena
+        for index in self._indices:
+            yield Instruction(arena[index])
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    @property
+    def underlying_type(self) -> Array:
+        return self._arena
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)} instructions)'
@@ -1,6 +1,7 @@
 import os
 import sys
-from ctypes import c_uint8, c_uint32, c_uint64, c_void_p, c_size_t, CDLL, POINTER, pointer, c_char_p, c_int16
+from ctypes import (c_uint8, c_uint32, c_uint64, c_void_p, c_size_t, CDLL, POINTER, pointer, byref, c_char_p,
+                    c_int16, create_string_buffer)
 import typing
 
 from .zydis_types import Decoder, Instruction, Operand, Formatter
@@ -101,15 +102,28 @@ def DecoderEnableMode(decoder: Decoder, mode: DecoderMode, enabled: bool) -> Sta
     return Status(_zydis.ZydisDecoderEnableMode(pointer(decoder), mode, enabled))
 
 
-def DecoderDecodeBuffer(decoder: Decoder, buffer: typing.Sequence[c_uint8], length: int, instructionPointer: int)\
-        -> typing.Tuple[Status, Instruction]:
-    instruction = Instruction()
-    status = Status(_zydis.ZydisDecoderDecodeBuffer(pointer(decoder), buffer, length, instructionPointer,
-                                                    pointer(instruction)))
+def DecoderDecodeBuffer(decoder: Decoder, buffer: typing.Sequence[c_uint8], length: int, instructionPointer: int,
+                        instruction: typing.Optional[Instruction] = None) -> typing.Tuple[Status, Instruction]:
+    if instruction is None:
+        instruction = Instruction()
+
+    status = Status(_zydis.ZydisDecoderDecodeBuffer(byref(decoder), buffer, length, instructionPointer,
+                                                    byref(instruction)))
 
     return (status, instruction)
 
 
+def DecoderDecodeBufferInto(decoder: Decoder, instruction: Instruction) -> typing.Callable[[int, int, int], int]:
+    # For loops decoding into the same instruction over and over. The returned function takes the buffer address,
+    # length and instruction pointer, the references are built once and the status is returned as a plain int.
+    decode_buffer = _zydis.ZydisDecoderDecodeBuffer
+    decoder_reference = byref(decoder)
+    instruction_reference = byref(instruction)
+
+    return lambda buffer, length, instructionPointer: decode_buffer(decoder_reference, buffer, length,
+                                                                    instructionPointer, instruction_reference)
+
+
 def CalcAbsoluteAddress(instruction: Instruction, operand: Operand) -> typing.Tuple[Status, int]:
     address = c_uint64()
     status = Status(_zydis.ZydisCalcAbsoluteAddress(pointer(instruction), operand, address))
@@ -154,16 +168,17 @@ def FormatterSetProperty(formatter: Formatter, property: FormatterProperty, valu
 
 
 def FormatterFormatInstruction(formatter: Formatter, instruction: Instruction) -> typing.Tuple[Status, str]:
-    buffer = b'\x00' * 128
+    # A fresh buffer per call, a bytes literal here would be a constant shared by every caller and thread.
+    buffer = create_string_buffer(128)
     status = Status(_zydis.ZydisFormatterFormatInstruction(pointer(formatter), pointer(instruction),
                                                            buffer, len(buffer)))
-    buffer = buffer.decode('ascii').partition('\x00')[0] if status == Status.Success else ''
-    return (status, buffer)
+    string = buffer.value.decode('ascii') if status == Status.Success else ''
+    return (status, string)
 
 
 def FormatterFormatOperand(formatter: Formatter, instruction: Instruction, index: int) -> typing.Tuple[Status, str]:
-    buffer = b'\x00' * 128
+    buffer = create_string_buffer(128)
     status = Status(_zydis.ZydisFormatterFormatOperand(pointer(formatter), pointer(instruction), index, buffer,
                                                        len(buffer)))
-    buffer = buffer.decode('ascii').partition('\x00')[0] if status == Status.Success else ''
-    return (status, buffer)
+    string = buffer.value.decode('ascii') if status == Status.Success else ''
+    return (status, string)
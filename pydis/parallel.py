@@ -0,0 +1,114 @@
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from ctypes import string_at
+from itertools import islice
+import os
+import typing
+
+from .types import MachineMode, AddressWidth, Status
+from .zydis_types import MaxInstructionLength
+from .buffer import Buffer, BufferLike
+from .batch import InstructionBatch
+from .decoder import Decoder
+from .diskcache import DiskCache
+
+
+# Chunks smaller than this cost more to ship to a worker than to decode in place.
+MinimumChunkSize = 256 * 1024
+
+# Decoders of a worker process by machine mode and address width, created on first use. A pool initializer would
+# need Python 3.7.
+_worker_decoders: typing.Dict[typing.Tuple[MachineMode, AddressWidth], Decoder] = {}
+
+
+def _decode_chunk(data: bytes, chunk_start: int, chunk_end: int, address: int, mode: MachineMode,
+                  address_width: AddressWidth) -> typing.Tuple[InstructionBatch, Status, int]:
+    # data starts at chunk_start and runs up to MaxInstructionLength - 1 bytes past chunk_end, enough to decode any
+    # instruction starting inside the chunk exactly as a sweep over the whole buffer would.
+    decoder = _worker_decoders.get((mode, address_width))
+    if decoder is None:
+        decoder = _worker_decoders[mode, address_width] = Decoder(mode, address_width)
+
+    batch = InstructionBatch()
+
+    with Buffer(data) as buf:
+        status, stop = decoder._decode_batch_range(batch, buf.address - chunk_start, chunk_start + buf.length,
+                                                   address, chunk_start, chunk_end)
+
+    return batch, status, stop
+
+
+def _decode_chunks(decoder: Decoder, buf: Buffer, address: int, workers: int, mode: MachineMode,
+                   address_width: AddressWidth, chunk_size: int) -> InstructionBatch:
+    chunks = ((start, min(start + chunk_size, buf.length)) for start in range(0, buf.length, chunk_size))
+
+    with ProcessPoolExecutor(workers) as executor:
+        def submit(start: int, end: int) -> Future:
+            return executor.submit(_decode_chunk,
+                                   string_at(buf.address + start,
+                                             min(end + MaxInstructionLength - 1, buf.length) - start),
+                                   start, end, address, mode, address_width)
+
+        # Chunks are copied out of the buffer as they are submitted, keeping only a few in flight bounds the copies
+        # alive at once.
+        pending = deque((end, submit(start, end)) for start, end in islice(chunks, workers * 2))
+
+        result = InstructionBatch()
+        buffer_offset = 0
+        while pending:
+            chunk_end, future = pending.popleft()
+            for start, end in islice(chunks, 1):
+                pending.append((end, submit(start, end)))
+
+            batch, _, stop = future.result()
+
+            # Each chunk was decoded from its first byte which may be in the middle of an instruction. Walk the true
+            # boundaries forward one instruction at a time until they meet the chunk's own boundaries, from there on
+            # both sweeps are identical. A chunk that stopped early on a failure or at the end of the buffer leaves
+            # the sweep at that offset so decoding it again reproduces the serial result.
+            while buffer_offset < chunk_end:
+                index = bisect_left(batch.offsets, buffer_offset)
+                if index < len(batch) and batch.offsets[index] == buffer_offset:
+                    result.extend(batch, index)
+                    buffer_offset = stop
+                    continue
+
+                status, buffer_offset = decoder._decode_batch_range(result, buf.address, buf.length, address,
+                                                                    buffer_offset, buffer_offset + 1)
+                if status == Status.NoMoreData:
+                    return result
+                if status != Status.Success:
+                    raise Exception(f'Failed while decoding: {status.name}')
+
+    return result
+
+
+def parallel_decode(buffer: BufferLike, address: int = 0, workers: typing.Optional[int] = None,
+                    mode: MachineMode = MachineMode.Long64, address_width: AddressWidth = AddressWidth.Width64,
+                    chunk_size: typing.Optional[int] = None,
+                    disk_cache: typing.Optional[DiskCache] = None) -> InstructionBatch:
+    workers = workers or os.cpu_count() or 1
+    decoder = Decoder(mode, address_width, disk_cache=disk_cache)
+
+    with Buffer(buffer) as buf:
+        if chunk_size is None:
+            chunk_size = max(buf.length // (workers * 4), MinimumChunkSize)
+        chunk_size = max(chunk_size, MaxInstructionLength)
+
+        if workers == 1 or buf.length <= chunk_size:
+            return decoder.decode_batch(buffer, address)
+
+        # The result is the same as decode_batch's so both share cache entries.
+        if disk_cache is not None:
+            key = disk_cache.key(buffer, address, bytes(decoder._decoder))
+            result = disk_cache.load(key)
+            if result is not None:
+                return result
+
+        result = _decode_chunks(decoder, buf, address, workers, mode, address_width, chunk_size)
+
+    if disk_cache is not None:
+        disk_cache.store(key, result)
+
+    return result
@@ -0,0 +1,97 @@
+import asyncio
+import typing
+
+from .types import MachineMode, AddressWidth
+from .buffer import BufferLike
+from .decoder import Decoder
+from .instruction import Instruction
+
+
+DefaultChunkSize = 64 * 1024
+
+AsyncByteSource = typing.Union[asyncio.StreamReader, typing.AsyncIterable[bytes]]
+
+
+class StreamDecoder:
+    """
+    Decodes a stream that arrives in arbitrary chunks. Only the start of an instruction cut off by the end of a chunk
+    is kept between calls, so memory use doesn't depend on the length of the stream.
+    """
+
+    def __init__(self, mode: MachineMode = MachineMode.Long64, address_width: AddressWidth = AddressWidth.Width64,
+                 address: int = 0) -> None:
+        self._decoder = Decoder(mode, address_width)
+        self._pending = b''
+        self.address = address
+
+    @property
+    def decoder(self) -> Decoder:
+        return self._decoder
+
+    @property
+    def pending(self) -> bytes:
+        return self._pending
+
+    def feed(self, chunk: BufferLike) -> typing.List[Instruction]:
+        data = self._pending + bytes(chunk) if self._pending else chunk
+
+        instructions, consumed = self._decoder._decode_available(data, self.address, False)
+        self._pending = bytes(data[consumed:])
+        self.address += consumed
+
+        return instructions
+
+    def flush(self) -> typing.List[Instruction]:
+        # Like Decoder.decode a trailing partial instruction is dropped.
+        instructions = []
+        if self._pending:
+            instructions, _ = self._decoder._decode_available(self._pending, self.address, True)
+
+        self.address += len(self._pending)
+        self._pending = b''
+
+        return instructions
+
+
+def decode_stream(fileobj: typing.BinaryIO, chunk_size: int = DefaultChunkSize, address: int = 0,
+                  mode: MachineMode = MachineMode.Long64,
+                  address_width: AddressWidth = AddressWidth.Width64) -> typing.Generator[Instruction, None, None]:
+    # read1 returns whatever a pipe or terminal has available instead of blocking for a full chunk, sockets only
+    # provide recv.
+    read = getattr(fileobj, 'read1', None) or getattr(fileobj, 'read', None) or fileobj.recv
+    stream = StreamDecoder(mode, address_width, address)
+
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+
+        yield from stream.feed(chunk)
+
+    yield from stream.flush()
+
+
+async def _read_chunks(source: AsyncByteSource, chunk_size: int) -> typing.AsyncGenerator[bytes, None]:
+    if hasattr(source, 'read'):
+        while True:
+            chunk = await source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        async for chunk in source:
+            yield chunk
+
+
+async def adecode(source: AsyncByteSource, address: int = 0, mode: MachineMode = MachineMode.Long64,
+                  address_width: AddressWidth = AddressWidth.Width64,
+                  chunk_size: int = DefaultChunkSize) -> typing.AsyncGenerator[Instruction, None]:
+    stream = StreamDecoder(mode, address_width, address)
+    loop = asyncio.get_event_loop()
+
+    async for chunk in _read_chunks(source, chunk_size):
+        for instruction in await loop.run_in_executor(None, stream.feed, chunk):
+            yield instruction
+
+    for instruction in stream.flush():
+        yield instruction
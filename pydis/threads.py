@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import typing
+
+
+T = typing.TypeVar('T')
+R = typing.TypeVar('R')
+
+
+def thread_map(make_function: typing.Callable[[], typing.Callable[[T], R]], items: typing.Sequence[T],
+               threads: typing.Optional[int] = None) -> typing.List[R]:
+    # make_function is called once per thread so each thread can work with its own copy of any state. Zydis calls
+    # release the GIL so the threads overlap while they are in the library. Items are handed out in one contiguous run
+    # per thread, submitting them one by one costs more than decoding a short snippet.
+    threads = min(threads or os.cpu_count() or 1, len(items))
+    if threads <= 1:
+        function = make_function()
+        return [function(item) for item in items]
+
+    def run(start: int, stop: int) -> typing.List[R]:
+        function = make_function()
+        return [function(item) for item in items[start:stop]]
+
+    step = -(-len(items) // threads)
+    with ThreadPoolExecutor(threads) as executor:
+        runs = [executor.submit(run, start, start + step) for start in range(0, len(items), step)]
+
+        results = []
+        for future in runs:
+            results.extend(future.result())
+
+    return results
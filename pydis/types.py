@@ -319,16 +319,18 @@ class MaskModes(IntEnum):
 class MemOpType(IntEnum):
     """ Values that represent memory-operand types. """
 
+    Invalid = 0
+
     ''' Normal memory operand. '''
-    Mem = 0
+    Mem = 1
 
     ''' The memory operand is only used for address-generation. No real memory-access is caused. '''
-    Agen = 1
+    Agen = 2
 
     ''' A memory operand using `SIB` addressing form, where the index register is not used
         in address calculation and scale is ignored. No real memory-access is caused.
     '''
-    MIB = 2
+    MIB = 3
 
 
 class BroadcastModes(IntEnum):
@@ -141,7 +141,7 @@ def setup_package():
           long_description=long_description,
           long_description_content_type='text/markdown',
           version=get_version(),
-          packages=['pydis'],
+          packages=['pydis', 'pydis.analysis'],
           python_requires='>=3.6',
           license='MIT',
           scripts=['scripts/pydisinfo'],
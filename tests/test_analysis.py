@@ -0,0 +1,250 @@
+import struct
+import unittest
+
+import pydis
+from pydis.analysis import (recursive_disassemble, build_cfg, find_functions, dominator_tree, post_dominator_tree,
+                            find_loops, CallGraph, build_call_graph, ReferenceKind, build_xrefs, scan_xrefs)
+from pydis.batch import BatchColumns, NoTarget
+
+
+image_address = 0x401000
+
+# Code with inline data that a linear sweep would run into:
+#   0x00 call 0x0a
+#   0x05 jmp 0x0f
+#   0x07 data
+#   0x0a nop
+#   0x0b ret
+#   0x0c data
+#   0x0f xor eax, eax
+#   0x11 ret
+image = b'\xe8\x05\x00\x00\x00\xeb\x08\x06\x06\x06\x90\xc3\x06\x06\x06\x31\xc0\xc3'
+
+# A loop with a conditional skip into its body:
+#   0x00 xor eax, eax     block 0
+#   0x02 test edi, edi
+#   0x04 jz 0x09
+#   0x06 add eax, 1       block 1
+#   0x09 inc eax          block 2
+#   0x0b jnz 0x06
+#   0x0d ret              block 3
+loop = b'\x31\xc0\x85\xff\x74\x03\x83\xc0\x01\xff\xc0\x75\xf9\xc3'
+
+# Two nested loops:
+#   0x00 xor eax, eax     block 0
+#   0x02 xor ecx, ecx     block 1, outer loop
+#   0x04 inc ecx          block 2, inner loop
+#   0x06 cmp ecx, 4
+#   0x09 jnz 0x04
+#   0x0b inc eax          block 3
+#   0x0d cmp eax, 4
+#   0x10 jnz 0x02
+#   0x12 ret              block 4
+nested = b'\x31\xc0\x31\xc9\xff\xc1\x83\xf9\x04\x75\xf9\xff\xc0\x83\xf8\x04\x75\xf0\xc3'
+
+# Code and data references:
+#   0x00 call 0x15
+#   0x05 jz 0x05
+#   0x07 jmp -0x77
+#   0x09 mov rax, [rip + 0x10]
+#   0x10 mov [rip + 0x20], eax
+#   0x16 lea rdi, [rip + 0x30]
+#   0x1d add dword ptr [rip + 0x04], 1
+#   0x24 ret
+references = b'\xe8\x10\x00\x00\x00\x74\xfe\xeb\x80\x48\x8b\x05\x10\x00\x00\x00\x89\x05\x20\x00\x00\x00' + \
+             b'\x48\x8d\x3d\x30\x00\x00\x00\x83\x05\x04\x00\x00\x00\x01\xc3'
+
+# Four functions separated by padding:
+#   0x00 push rbp; mov rbp, rsp; call 0x10; pop rbp; ret     prologue
+#   0x10 xor eax, eax; jmp 0x18                              call target
+#   0x18 mov eax, 1; ret                                     tail call target
+#   0x20 endbr64; ret                                        prologue
+functions = b'\x55\x48\x89\xe5\xe8\x07\x00\x00\x00\x5d\xc3' + b'\xcc' * 5 + \
+            b'\x31\xc0\xe9\x01\x00\x00\x00\xcc' + \
+            b'\xb8\x01\x00\x00\x00\xc3\x90\x90' + \
+            b'\xf3\x0f\x1e\xfa\xc3'
+
+
+class TestRecursiveDisassemble(unittest.TestCase):
+    def test_follows_control_flow(self):
+        batch = recursive_disassemble(image, [image_address], image_address)
+
+        self.assertListEqual(list(batch.offsets), [0x00, 0x05, 0x0a, 0x0b, 0x0f, 0x11])
+        self.assertListEqual(list(batch.addresses), [image_address + offset for offset in batch.offsets])
+        self.assertListEqual(list(batch.mnemonics), [pydis.Mnemonic.CALL, pydis.Mnemonic.JMP, pydis.Mnemonic.NOP,
+                                                     pydis.Mnemonic.RET, pydis.Mnemonic.XOR, pydis.Mnemonic.RET])
+        self.assertListEqual(list(batch.targets), [image_address + 0x0a, image_address + 0x0f] + [NoTarget] * 4)
+
+        with self.assertRaises(Exception):
+            list(pydis.decode(image))
+
+    def test_parallel_matches_serial(self):
+        # A tree of small functions, function i calls 2i + 1 and 2i + 2:
+        #   call; call; jz +2; nop; nop; ret; padding
+        count = 3000
+        image = bytearray()
+        for function in range(count):
+            start = len(image)
+            for callee in (2 * function + 1, 2 * function + 2):
+                target = callee if callee < count else function
+                image += b'\xe8' + struct.pack('<i', target * 32 - (len(image) + 5))
+            image += b'\x74\x02\x90\x90\xc3'
+            image += b'\xcc' * (32 - (len(image) - start))
+
+        serial = recursive_disassemble(image, [image_address], image_address)
+        self.assertEqual(len(serial), count * 6)
+
+        parallel = recursive_disassemble(image, [image_address], image_address, workers=3)
+        for name, _ in BatchColumns:
+            self.assertListEqual(list(getattr(parallel, name)), list(getattr(serial, name)), name)
+
+    def test_parallel_decoder_modes(self):
+        # The workers decode with the same decoder modes. Minimal decoding still finds the branch targets but doesn't
+        # decode any operands.
+        decoder = pydis.Decoder()
+        decoder.minimal = True
+        serial = recursive_disassemble(image, [image_address], image_address, decoder=decoder)
+        parallel = recursive_disassemble(image, [image_address], image_address, decoder=decoder, workers=2)
+        self.assertListEqual(list(serial.offsets), [0x00, 0x05, 0x0a, 0x0b, 0x0f, 0x11])
+        self.assertListEqual(list(serial.operand_counts), [0] * 6)
+        for name, _ in BatchColumns:
+            self.assertListEqual(list(getattr(parallel, name)), list(getattr(serial, name)), name)
+
+    def test_entry_points(self):
+        batch = recursive_disassemble(image, [image_address + 0x0f, image_address + 0x0a], image_address)
+        self.assertListEqual(list(batch.offsets), [0x0a, 0x0b, 0x0f, 0x11])
+
+        with self.assertRaises(IndexError):
+            recursive_disassemble(image, [image_address + len(image)], image_address)
+
+
+class TestControlFlowGraph(unittest.TestCase):
+    def test_blocks_and_edges(self):
+        cfg = build_cfg(pydis.decode_batch(loop, image_address))
+
+        self.assertEqual(len(cfg), 4)
+        self.assertListEqual(list(cfg.block_starts), [0, 3, 4, 6, 7])
+        self.assertListEqual(list(cfg.block_addresses), [image_address + offset for offset in (0x00, 0x06, 0x09, 0x0d)])
+        self.assertListEqual([list(cfg.block_successors(block)) for block in range(4)], [[1, 2], [2], [3, 1], []])
+        self.assertListEqual([list(cfg.block_predecessors(block)) for block in range(4)], [[], [0, 2], [0, 1], [2]])
+        self.assertEqual(cfg.block_instructions(2), range(4, 6))
+
+        self.assertEqual(cfg.block_at(image_address + 0x0b), 2)
+        self.assertIsNone(cfg.block_at(image_address + 0x0c))
+
+    def test_gaps_split_blocks(self):
+        cfg = build_cfg(recursive_disassemble(image, [image_address], image_address))
+
+        # call, jmp | nop, ret | xor, ret
+        self.assertListEqual(list(cfg.block_starts), [0, 2, 4, 6])
+        self.assertListEqual([list(cfg.block_successors(block)) for block in range(3)], [[2], [], []])
+
+    def test_empty(self):
+        self.assertEqual(len(build_cfg(pydis.InstructionBatch())), 0)
+
+
+class TestDominators(unittest.TestCase):
+    def test_dominators(self):
+        cfg = build_cfg(pydis.decode_batch(nested, image_address))
+        dominators = dominator_tree(cfg)
+
+        self.assertListEqual(list(dominators.idom), [0, 0, 1, 2, 3])
+        self.assertIsNone(dominators.immediate_dominator(0))
+        self.assertTrue(dominators.dominates(1, 4))
+        self.assertTrue(dominators.dominates(2, 2))
+        self.assertFalse(dominators.dominates(3, 2))
+
+        self.assertListEqual(list(post_dominator_tree(cfg).idom), [1, 2, 3, 4, 4])
+
+    def test_loops(self):
+        loops = find_loops(build_cfg(pydis.decode_batch(nested, image_address)))
+
+        self.assertListEqual(list(loops.headers), [2, 1])
+        self.assertListEqual(list(loops.parents), [1, -1])
+        self.assertListEqual(list(loops.loop_blocks(1)), [1, 2, 3])
+        self.assertListEqual([loops.loop_depth(block) for block in range(5)], [0, 1, 2, 1, 0])
+
+        # The loop of the other image is entered at two blocks and isn't a natural loop.
+        self.assertEqual(len(find_loops(build_cfg(pydis.decode_batch(loop, image_address)))), 0)
+
+
+class TestFindFunctions(unittest.TestCase):
+    def test_heuristics(self):
+        table = find_functions(functions, pydis.decode_batch(functions, image_address), image_address)
+
+        self.assertListEqual(list(table), [(image_address + start, image_address + end)
+                                           for start, end in ((0x00, 0x0b), (0x10, 0x17), (0x18, 0x1e), (0x20, 0x25))])
+        self.assertEqual(table.function_at(image_address + 0x1a), 2)
+        self.assertIsNone(table.function_at(image_address + 0x1f))
+
+    def test_entry_points(self):
+        # Without the call the second function is only found through the entry point.
+        image = functions[:4] + b'\x90' * 5 + functions[9:]
+        batch = pydis.decode_batch(image, image_address)
+
+        self.assertNotIn(image_address + 0x10, find_functions(image, batch, image_address).starts)
+        self.assertIn(image_address + 0x10, find_functions(image, batch, image_address, [image_address + 0x10]).starts)
+
+
+class TestCallGraph(unittest.TestCase):
+    def test_build(self):
+        batch = pydis.decode_batch(functions, image_address)
+        graph = build_call_graph(batch, find_functions(functions, batch, image_address))
+
+        self.assertEqual(len(graph), 1)
+        self.assertListEqual(list(graph.callees_of(image_address)), [image_address + 0x10])
+        self.assertListEqual(list(graph.call_sites_of(image_address)), [image_address + 0x04])
+        self.assertListEqual(list(graph.callers_of(image_address + 0x10)), [image_address])
+        self.assertIn(image_address + 0x20, graph)
+
+    def test_update(self):
+        graph = CallGraph()
+        graph.set_calls(0x1000, [(0x1010, 0x3000), (0x1004, 0x2000), (0x1008, None)])
+        graph.set_calls(0x2000, [(0x2004, 0x3000)])
+
+        self.assertListEqual(list(graph.callees_of(0x1000)), [0x2000, 0x3000])
+        self.assertListEqual(list(graph.callers_of(0x3000)), [0x1000, 0x2000])
+        self.assertListEqual(list(graph.indirect_call_sites(0x1000)), [0x1008])
+
+        # Re-analyzing a function replaces its edges and leaves the others alone.
+        graph.set_function(0x1000, pydis.decode(b'\xe8\xfb\x1f\x00\x00\xc3', 0x1000))
+        self.assertListEqual(list(graph.callees_of(0x1000)), [0x3000])
+        self.assertListEqual(list(graph.callers_of(0x2000)), [])
+        self.assertListEqual(list(graph.callers_of(0x3000)), [0x1000, 0x2000])
+        self.assertListEqual(list(graph.indirect_call_sites(0x1000)), [])
+
+        graph.remove_function(0x2000)
+        self.assertNotIn(0x2000, graph)
+        self.assertListEqual(list(graph.call_sites_to(0x3000)), [0x1000])
+
+
+class TestXrefs(unittest.TestCase):
+    def test_kinds(self):
+        xrefs = build_xrefs(pydis.decode(references, image_address))
+
+        self.assertListEqual([(reference.source - image_address, reference.target - image_address, reference.kind)
+                              for reference in xrefs],
+                             [(0x07, -0x77, ReferenceKind.Jump), (0x05, 0x05, ReferenceKind.ConditionalJump),
+                              (0x00, 0x15, ReferenceKind.Call), (0x09, 0x20, ReferenceKind.Read),
+                              (0x1d, 0x28, ReferenceKind.Read), (0x1d, 0x28, ReferenceKind.Write),
+                              (0x10, 0x36, ReferenceKind.Write), (0x16, 0x4d, ReferenceKind.AddressTaken)])
+
+    def test_lookup(self):
+        xrefs = scan_xrefs(references, image_address)
+
+        self.assertEqual(len(xrefs), 8)
+        self.assertListEqual([reference.kind for reference in xrefs.references_to(image_address + 0x28)],
+                             [ReferenceKind.Read, ReferenceKind.Write])
+        self.assertListEqual(xrefs.references_to(image_address + 0x29), [])
+        self.assertEqual(len(list(xrefs.references_between(image_address + 0x20, image_address + 0x40))), 4)
+
+        # Only the given offsets are decoded.
+        self.assertEqual(len(scan_xrefs(references, image_address, [0x00, 0x24])), 1)
+
+        for offset in (-5, len(references), 1 << 40):
+            with self.assertRaises(IndexError):
+                scan_xrefs(references, image_address, [offset])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pydis
+from pydis.batch import InstructionBatch, BatchColumns, NoTarget
+
+
+instructions = b'\x51\x8d\x45\xff\x50\xff\x75\x0c\xff\x75\x08\xff\x15\xa0\xa5\x48\x76\x85\xc0\x0f\x88\xfc\xda\x02\x00'
+instruction_pointer = 0x007FFFFFFF400000
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestInstructionBatch(unittest.TestCase):
+    def test_decode_batch(self):
+        decoder = pydis.Decoder()
+        batch = decoder.decode_batch(instructions, instruction_pointer)
+        expected = list(decoder.decode(instructions, instruction_pointer))
+
+        self.assertIsInstance(batch, InstructionBatch)
+        self.assertEqual(len(batch), len(expected))
+        self.assertListEqual(list(batch.offsets), [0, 1, 4, 5, 8, 11, 17, 19])
+        self.assertListEqual(list(batch.lengths), [instruction.length for instruction in expected])
+        self.assertListEqual(list(batch.mnemonics), [instruction.mnemonic_value for instruction in expected])
+        self.assertListEqual(list(batch.categories), [instruction.meta.category for instruction in expected])
+        self.assertListEqual(list(batch.encodings), [instruction.encoding for instruction in expected])
+        self.assertListEqual(list(batch.operand_counts), [len(instruction.operands) for instruction in expected])
+        self.assertListEqual(list(batch.attributes), [instruction.attributes for instruction in expected])
+        self.assertListEqual(list(batch.addresses), [instruction.address for instruction in expected])
+        self.assertListEqual(list(batch.targets), [NoTarget] * 7 + [0x007FFFFFFF42DB15])
+        self.assertEqual(expected[-1].branch_target, 0x007FFFFFFF42DB15)
+        self.assertListEqual(list(batch.classes), [instruction.classes for instruction in expected])
+        self.assertEqual(batch.classes[-1], pydis.MnemonicClass.Branch | pydis.MnemonicClass.Conditional)
+
+    def test_max_count(self):
+        batch = pydis.decode_batch(instructions, instruction_pointer, max_count=3)
+
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.mnemonics[2], pydis.Mnemonic.PUSH)
+
+    def test_targets_32bit(self):
+        # Targets wrap at 32 bits, or at 16 bits with a 16 bit operand size, and agree between the decode paths.
+        mode = pydis.MachineMode.LongCompat32
+        address_width = pydis.AddressWidth.Width32
+        for code, address, expected in ((b'\xe9\x85\xe2\x10\xe3', 0x401000, 0xe350f28a),
+                                         (b'\x66\xeb\xff', 0x401017, 0x1019)):
+            batch = pydis.decode_batch(code, address, mode=mode, address_width=address_width)
+            instruction, = pydis.decode(code, address, mode=mode, address_width=address_width)
+            superset = pydis.superset(code, address, mode=mode, address_width=address_width)
+
+            self.assertEqual(batch.targets[0], expected)
+            self.assertEqual(instruction.branch_target, expected)
+            self.assertEqual(superset.targets[0], expected)
+
+    def test_minimal_targets(self):
+        # Minimal decoding skips the operands, targets come from the raw immediates instead.
+        for code, address, mode, address_width in ((instructions, instruction_pointer, pydis.MachineMode.Long64,
+                                                    pydis.AddressWidth.Width64),
+                                                   (b'\xe9\x85\xe2\x10\xe3\x66\xeb\xff', 0x401000,
+                                                    pydis.MachineMode.LongCompat32, pydis.AddressWidth.Width32)):
+            decoder = pydis.Decoder(mode, address_width)
+            decoder.minimal = True
+            batch = decoder.decode_batch(code, address)
+
+            self.assertListEqual(list(batch.operand_counts), [0] * len(batch))
+            self.assertListEqual(list(batch.targets), list(pydis.decode_batch(code, address, mode=mode,
+                                                                              address_width=address_width).targets))
+
+    def test_decode_error(self):
+        with self.assertRaises(Exception):
+            pydis.decode_batch(b'\x51\xff\xff')
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_view(self):
+        batch = pydis.decode_batch(instructions, instruction_pointer)
+        columns = batch.to_numpy()
+
+        self.assertEqual(columns['mnemonics'].dtype, numpy.uint16)
+        self.assertEqual(columns['lengths'].dtype, numpy.uint8)
+        self.assertListEqual(columns['addresses'].tolist(), list(batch.addresses))
+
+        # The views share memory with the batch.
+        batch.lengths[0] = 9
+        self.assertEqual(columns['lengths'][0], 9)
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def assertBatchEqual(self, first, second):
+        for name, _ in BatchColumns:
+            self.assertEqual(getattr(first, name), getattr(second, name))
+
+    def test_hit(self):
+        cache = pydis.DiskCache(self.directory.name)
+        expected = pydis.decode_batch(instructions, instruction_pointer)
+
+        self.assertBatchEqual(pydis.decode_batch(instructions, instruction_pointer, disk_cache=cache), expected)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        # A new cache on the same directory, as another process would see it.
+        cache = pydis.DiskCache(self.directory.name)
+        self.assertBatchEqual(pydis.decode_batch(instructions, instruction_pointer, disk_cache=cache), expected)
+        self.assertBatchEqual(pydis.parallel_decode(instructions, instruction_pointer, disk_cache=cache), expected)
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+
+    def test_key(self):
+        cache = pydis.DiskCache(self.directory.name)
+        pydis.decode_batch(instructions, instruction_pointer, disk_cache=cache)
+        pydis.decode_batch(instructions, instruction_pointer + 1, disk_cache=cache)
+        pydis.decode_batch(instructions[:-1], instruction_pointer, disk_cache=cache)
+        pydis.decode_batch(instructions, instruction_pointer, max_count=2, disk_cache=cache)
+        pydis.decode_batch(instructions, 0x1000, mode=pydis.MachineMode.LongCompat32,
+                           address_width=pydis.AddressWidth.Width32, disk_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 5))
+        self.assertEqual(len(os.listdir(self.directory.name)), 5)
+
+    def test_corrupt_entry(self):
+        cache = pydis.DiskCache(self.directory.name)
+        pydis.decode_batch(instructions, instruction_pointer, disk_cache=cache)
+        path, = (os.path.join(self.directory.name, name) for name in os.listdir(self.directory.name))
+        with open(path, 'r+b') as file:
+            file.truncate(os.path.getsize(path) - 1)
+
+        batch = pydis.decode_batch(instructions, instruction_pointer, disk_cache=cache)
+        self.assertBatchEqual(batch, pydis.decode_batch(instructions, instruction_pointer))
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+    def test_eviction(self):
+        cache = pydis.DiskCache(self.directory.name)
+        pydis.decode_batch(instructions, 0, disk_cache=cache)
+        entry_size = cache.size()
+
+        cache.max_bytes = entry_size * 2
+        for address in range(1, 4):
+            pydis.decode_batch(instructions, address, disk_cache=cache)
+        self.assertEqual(cache.size(), entry_size * 2)
+
+        # The newest entries survive.
+        pydis.decode_batch(instructions, 3, disk_cache=cache)
+        pydis.decode_batch(instructions, 0, disk_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 5))
+
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+
+    def test_scans(self):
+        # Only the first store scans the directory while the entries stay under budget.
+        cache = pydis.DiskCache(self.directory.name)
+        with mock.patch('pydis.diskcache.os.scandir', wraps=os.scandir) as scandir:
+            for address in range(10):
+                pydis.decode_batch(instructions, address, disk_cache=cache)
+        self.assertEqual(scandir.call_count, 1)
+
+    def test_evicted_while_loading(self):
+        cache = pydis.DiskCache(self.directory.name)
+        expected = pydis.decode_batch(instructions, instruction_pointer, disk_cache=cache)
+
+        with mock.patch('pydis.diskcache.os.utime', side_effect=FileNotFoundError):
+            self.assertBatchEqual(pydis.decode_batch(instructions, instruction_pointer, disk_cache=cache), expected)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
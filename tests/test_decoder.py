@@ -1,5 +1,13 @@
 import unittest
+import array
+import mmap
+import os
+import tempfile
+from unittest import mock
+
 import pydis
+from pydis.zydis_types import Instruction as RawInstruction
+from pydis.batch import NoTarget
 
 
 instructions = b'\x51\x8d\x45\xff\x50\xff\x75\x0c\xff\x75\x08\xff\x15\xa0\xa5\x48\x76\x85\xc0\x0f\x88\xfc\xda\x02\x00'
@@ -34,6 +42,274 @@ class TestDecoder(unittest.TestCase):
         with self.assertRaises(IndexError):
             decoder.decode_instruction(instructions, buffer_offset=len(instructions))
 
+    def test_decoding_buffer_protocol(self):
+        decoder = pydis.Decoder()
+        expected = list(map(str, decoder.decode(instructions, instruction_pointer)))
+
+        with mmap.mmap(-1, len(instructions)) as mapping:
+            mapping.write(instructions)
+
+            for buffer in (bytearray(instructions), memoryview(instructions), array.array('B', instructions),
+                           mapping):
+                self.assertListEqual(list(map(str, decoder.decode(buffer, instruction_pointer))), expected)
+                self.assertEqual(str(decoder.decode_instruction(buffer, buffer_offset=1)), 'lea eax, [rbp-0x01]')
+
+        # The buffer is pinned while decoding so it can't be resized underneath the decoder.
+        buffer = bytearray(instructions)
+        instruction_iter = decoder.decode(buffer)
+        next(instruction_iter)
+        with self.assertRaises(BufferError):
+            buffer.extend(b'\x90')
+
+        instruction_iter.close()
+        buffer.extend(b'\x90')
+
+    def test_decode_instruction_truncated(self):
+        decoder = pydis.Decoder()
+
+        # The last instruction is missing its final byte, it shouldn't be decoded against padding.
+        with self.assertRaises(Exception):
+            decoder.decode_instruction(instructions[:-1], buffer_offset=19)
+
+    def test_decode_file(self):
+        decoder = pydis.Decoder()
+        expected = list(map(str, decoder.decode(instructions, instruction_pointer)))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'image.bin')
+            with open(path, 'wb') as file:
+                file.write(b'\xcc' * 5000 + instructions + b'\xcc' * 3)
+
+            instruction_iter = decoder.decode_file(path, 5000, len(instructions), instruction_pointer)
+            self.assertListEqual(list(map(str, instruction_iter)), expected)
+
+            # Force the swept pages to be released after every instruction.
+            with mock.patch('pydis.decoder.FileSweepWindow', 1):
+                self.assertEqual(len(list(pydis.decode_file(path))), 5000 + len(expected) + 3)
+
+            with self.assertRaises(IndexError):
+                next(decoder.decode_file(path, 5000, len(instructions) + 4))
+
+    def test_decode_into(self):
+        decoder = pydis.Decoder()
+        raw_instruction = RawInstruction()
+
+        instruction = decoder.decode_into(raw_instruction, instructions, 1, instruction_pointer + 1)
+        self.assertIs(instruction.underlying_type, raw_instruction)
+        self.assertEqual(str(instruction), 'lea eax, [rbp-0x01]')
+
+        decoder.decode_into(raw_instruction, instructions)
+        self.assertEqual(str(instruction), 'push rcx')
+
+        with self.assertRaises(IndexError):
+            decoder.decode_into(raw_instruction, instructions, len(instructions))
+
+    def test_decode_pooled(self):
+        decoder = pydis.Decoder()
+        expected = list(map(str, decoder.decode(instructions, instruction_pointer)))
+
+        decoded = []
+        raw_instructions = set()
+        for instruction in decoder.decode(instructions, instruction_pointer, pool_size=2):
+            decoded.append(str(instruction))
+            raw_instructions.add(id(instruction.underlying_type))
+
+        self.assertListEqual(decoded, expected)
+        self.assertEqual(len(raw_instructions), 2)
+
+    def test_decode_arena(self):
+        decoder = pydis.Decoder()
+        expected = list(map(str, decoder.decode(instructions, instruction_pointer)))
+
+        arena = decoder.decode_arena(instructions, instruction_pointer)
+        self.assertEqual(len(arena), len(expected))
+        self.assertListEqual(list(map(str, arena)), expected)
+        self.assertEqual(str(arena[-1]), expected[-1])
+        self.assertListEqual(list(map(str, arena[2:6:2])), expected[2:6:2])
+
+        # Elements reference the arena instead of owning their own structure.
+        self.assertIs(arena[3].underlying_type._b_base_, arena.underlying_type)
+
+        # The arena grows past its initial estimate when the instructions are shorter than average.
+        nops = pydis.decode_arena(b'\x90' * 100)
+        self.assertEqual(len(nops), 100)
+        self.assertEqual({instruction.mnemonic for instruction in nops}, {'nop'})
+
+        self.assertEqual(len(decoder.decode_arena(instructions, max_count=3)), 3)
+
+    def test_scan_lengths(self):
+        decoder = pydis.Decoder()
+
+        offsets, lengths = decoder.scan_lengths(instructions, instruction_pointer)
+        self.assertListEqual(list(offsets), [0, 1, 4, 5, 8, 11, 17, 19])
+        self.assertListEqual(list(lengths), [1, 3, 1, 3, 3, 6, 2, 6])
+
+        # The decoder's own mode is never touched, other threads may be decoding with it.
+        with mock.patch.object(decoder, 'set_mode', side_effect=AssertionError):
+            decoder.scan_lengths(instructions, instruction_pointer)
+            with self.assertRaises(Exception):
+                decoder.scan_lengths(b'\x51\xff\xff')
+        self.assertFalse(decoder.minimal)
+
+        # A mode set on the decoder carries over to the scan.
+        decoder.set_mode(pydis.DecoderMode.KNC, True)
+        self.assertTrue(decoder._minimal_decoder.decoderMode[pydis.DecoderMode.KNC])
+
+    def test_decode_many(self):
+        decoder = pydis.Decoder()
+        snippets = [(instructions[offset:], instruction_pointer + offset) for offset in (0, 1, 4, 5, 8, 11, 17, 19)]
+
+        expected = [list(map(str, decoder.decode(*snippet))) for snippet in snippets]
+        for threads in (1, 3):
+            decoded = decoder.decode_many(snippets * 20, threads=threads)
+            self.assertListEqual([list(map(str, snippet)) for snippet in decoded], expected * 20)
+
+        # Each thread works on a copy that keeps the decoder modes and leaves the decoder's own cache alone.
+        decoder = pydis.Decoder(cache_size=1 << 20)
+        decoder.minimal = True
+        decoded = decoder.decode_many(snippets * 20, threads=3)
+        self.assertTrue(all(not instruction.operands for snippet in decoded for instruction in snippet))
+        self.assertEqual(len(decoder.cache), 0)
+
+    def test_sweep(self):
+        decoder = pydis.Decoder()
+        expected = [instruction.mnemonic for instruction in decoder.decode(instructions)]
+
+        # 0x06 isn't valid in 64 bit mode and a lone 0x0f is a truncated instruction.
+        buffer = instructions[:5] + b'\x06\x06\x06' + instructions[5:] + b'\x0f'
+        entries = list(decoder.sweep(buffer, instruction_pointer))
+
+        bad_bytes = [entry for entry in entries if isinstance(entry, pydis.BadBytes)]
+        self.assertListEqual([entry.mnemonic for entry in entries if isinstance(entry, pydis.Instruction)], expected)
+        self.assertListEqual(bad_bytes, [pydis.BadBytes(5, instruction_pointer + 5, 3, pydis.Status.DecodingError),
+                                         pydis.BadBytes(28, instruction_pointer + 28, 1, pydis.Status.NoMoreData)])
+
+        # Decoding resumes at the next address that is a multiple of the alignment.
+        buffer = b'\x06' + b'\x90' * 7
+        entries = list(decoder.sweep(buffer, resync=pydis.ResyncPolicy.NextAligned, alignment=4))
+        self.assertEqual(entries[0], pydis.BadBytes(0, 0, 4, pydis.Status.DecodingError))
+        self.assertListEqual([entry.address for entry in entries[1:]], [4, 5, 6, 7])
+
+        # The alignment applies to addresses, not to offsets into the buffer.
+        entries = list(decoder.sweep(buffer, 0x1003, resync=pydis.ResyncPolicy.NextAligned, alignment=4))
+        self.assertEqual(entries[0], pydis.BadBytes(0, 0x1003, 1, pydis.Status.DecodingError))
+        self.assertListEqual([entry.address for entry in entries[1:]], list(range(0x1004, 0x100b)))
+
+        # A pooled sweep reuses the structures but decodes the same entries.
+        self.assertListEqual([entry.address for entry in decoder.sweep(buffer, 0x1003, pool_size=2)],
+                             [entry.address for entry in decoder.sweep(buffer, 0x1003)])
+
+        for alignment in (0, -4):
+            with self.assertRaises(ValueError):
+                list(decoder.sweep(buffer, resync=pydis.ResyncPolicy.NextAligned, alignment=alignment))
+
+        # A custom policy can skip ahead to any offset.
+        entries = list(pydis.sweep(buffer, resync=lambda offset, status: offset + 6))
+        self.assertEqual(entries[0], pydis.BadBytes(0, 0, 6, pydis.Status.DecodingError))
+        self.assertEqual(len(entries), 3)
+
+    def test_superset(self):
+        decoder = pydis.Decoder()
+
+        # The displacement of jmp -2 overlaps an inc byte ptr [rsi].
+        with mock.patch.object(decoder, 'set_mode', side_effect=AssertionError):
+            superset = decoder.superset(b'\xeb\xfe\x06\x90', 0x1000)
+        self.assertListEqual(list(superset.valid), [1, 1, 0, 1])
+        self.assertListEqual(list(superset.lengths), [2, 2, 0, 1])
+        self.assertListEqual(list(superset.mnemonics), [pydis.Mnemonic.JMP, pydis.Mnemonic.INC, 0, pydis.Mnemonic.NOP])
+        self.assertListEqual(list(superset.targets), [0x1000, NoTarget, NoTarget, NoTarget])
+        self.assertFalse(decoder.minimal)
+
+        # Every offset agrees with decoding there on its own.
+        superset = pydis.superset(instructions, instruction_pointer)
+        for offset in range(len(instructions)):
+            try:
+                instruction = decoder.decode_instruction(instructions[offset:], instruction_pointer + offset)
+            except Exception:
+                self.assertFalse(superset.valid[offset])
+                continue
+
+            self.assertEqual(superset.lengths[offset], instruction.length)
+            self.assertEqual(superset.mnemonics[offset], instruction.mnemonic_value)
+            self.assertEqual(superset.targets[offset], NoTarget if instruction.branch_target is None else
+                             instruction.branch_target)
+
+    def test_decode_backward(self):
+        decoder = pydis.Decoder()
+        expected = list(decoder.decode(instructions, instruction_pointer))
+        end = expected[-1].address + expected[-1].length
+
+        backward = decoder.decode_backward(instructions, instruction_pointer, end, 3)
+        self.assertListEqual([str(instruction) for instruction in backward], list(map(str, expected[-3:])))
+        self.assertListEqual([instruction.address for instruction in backward],
+                             [instruction.address for instruction in expected[-3:]])
+
+        # Fewer instructions are returned when the buffer starts before enough of them fit.
+        backward = decoder.decode_backward(instructions, instruction_pointer, expected[2].address, 5)
+        self.assertListEqual([instruction.address for instruction in backward],
+                             [instruction.address for instruction in expected[:2]])
+
+        with self.assertRaises(IndexError):
+            decoder.decode_backward(instructions, instruction_pointer, instruction_pointer - 1)
+
+    def test_decode_cache(self):
+        plain = pydis.Decoder()
+        buffer = instructions * 2
+        expected = [(instruction.address, str(instruction))
+                    for instruction in plain.decode(buffer, instruction_pointer)]
+
+        # The call through rip and the js are relative, their second copies are served from the cache.
+        decoder = pydis.Decoder(cache_size=1 << 20)
+        decoded = [(instruction.address, str(instruction))
+                   for instruction in decoder.decode(buffer, instruction_pointer)]
+        self.assertListEqual(decoded, expected)
+        self.assertEqual((decoder.cache.hits, decoder.cache.misses), (8, 8))
+
+        batch = decoder.decode_batch(buffer, instruction_pointer)
+        self.assertListEqual(list(batch.targets), list(plain.decode_batch(buffer, instruction_pointer).targets))
+        self.assertEqual(decoder.cache.hits, 24)
+
+        # The memory budget caps the number of entries.
+        decoder = pydis.Decoder(cache_size=pydis.decoder.DecodeCacheEntrySize * 4)
+        self.assertEqual(len(list(decoder.decode(buffer, instruction_pointer))), 16)
+        self.assertEqual((len(decoder.cache), decoder.cache.hits, decoder.cache.misses), (4, 0, 16))
+
+        with self.assertRaises(ValueError):
+            pydis.Decoder(cache_size=100)
+
+        # Instructions decoded with other decoder modes aren't shared.
+        decoder = pydis.Decoder(cache_size=1 << 20)
+        decoder.minimal = True
+        list(decoder.decode(buffer, instruction_pointer))
+        decoder.minimal = False
+        decoded = [(instruction.address, str(instruction))
+                   for instruction in decoder.decode(buffer, instruction_pointer)]
+        self.assertListEqual(decoded, expected)
+        self.assertEqual((decoder.cache.hits, decoder.cache.misses), (16, 16))
+
+    def test_bind(self):
+        decoder = pydis.Decoder()
+        expected = list(decoder.decode(instructions, instruction_pointer))
+
+        buffer = bytearray(instructions)
+        with decoder.bind(buffer, instruction_pointer, memo_size=2) as bound:
+            self.assertEqual(len(bound), len(instructions))
+            with self.assertRaises(BufferError):
+                buffer.append(0x90)
+
+            for instruction in reversed(expected):
+                self.assertEqual(str(bound.at(instruction.address)), str(instruction))
+            self.assertEqual(bound.at_offset(0).address, instruction_pointer)
+            self.assertEqual(bound.at_offset(0).length, 1)
+            self.assertEqual((bound.memo.hits, bound.memo.misses, len(bound.memo)), (2, 8, 2))
+
+            with self.assertRaises(IndexError):
+                bound.at(instruction_pointer - 1)
+
+        with self.assertRaises(ValueError):
+            bound.at_offset(0)
+        buffer.append(0x90)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 
 from pydis.formatter import Formatter
-from pydis.decoder import decode
+from pydis.types import DecoderMode
+from pydis.decoder import Decoder, decode
 
 
 class TestFormatter(unittest.TestCase):
@@ -25,6 +26,47 @@ class TestFormatter(unittest.TestCase):
 
         self.assertEqual(formatter.format_instruction(instruction.underlying_type), 'PUSH RCX')
 
+    def test_format_many(self):
+        formatter = Formatter()
+        instructions = [instruction.underlying_type for instruction in decode(b'\x51\x8d\x45\xff\x50' * 50)]
+
+        self.assertListEqual(formatter.format_many(instructions, threads=4),
+                             ['push rcx', 'lea eax, [rbp-0x01]', 'push rax'] * 50)
+
+        # Every thread formats with a copy carrying the same properties.
+        formatter.uppercase_letters = True
+        self.assertListEqual(formatter.format_many(instructions, threads=4),
+                             ['PUSH RCX', 'LEA EAX, [RBP-0x01]', 'PUSH RAX'] * 50)
+
+    def test_cache(self):
+        formatter = Formatter(cache_size=1 << 16)
+        instructions = [instruction.underlying_type for instruction in decode(b'\x51\xe8\x00\x00\x00\x00' * 3, 0x1000)]
+
+        # Relative instructions are only shared at the same address.
+        self.assertListEqual([formatter.format_instruction(instruction) for instruction in instructions],
+                             ['push rcx', 'call 0x0000000000001006'] + ['push rcx', 'call 0x000000000000100C'] +
+                             ['push rcx', 'call 0x0000000000001012'])
+        self.assertEqual((formatter.cache.hits, formatter.cache.misses), (2, 4))
+        self.assertEqual(formatter.format_instruction(instructions[1]), 'call 0x0000000000001006')
+        self.assertEqual(formatter.cache.hits, 3)
+
+        # Changing a property drops everything formatted before.
+        formatter.uppercase_letters = True
+        self.assertEqual(len(formatter.cache), 0)
+        self.assertEqual(formatter.format_instruction(instructions[0]), 'PUSH RCX')
+
+    def test_cache_decoder_modes(self):
+        formatter = Formatter(cache_size=1 << 16)
+        decoder = Decoder()
+        self.assertEqual(formatter.format_instruction(decoder.decode_instruction(b'\xf2\xc3').underlying_type),
+                         'bnd ret')
+
+        # The same bytes decode differently once a mode is toggled.
+        decoder.set_mode(DecoderMode.MPX, not decoder.is_mode_enabled(DecoderMode.MPX))
+        instruction = decoder.decode_instruction(b'\xf2\xc3').underlying_type
+        self.assertEqual(formatter.format_instruction(instruction), Formatter().format_instruction(instruction))
+        self.assertEqual(formatter.format_instruction(instruction), 'ret')
+
 
 if __name__ == '__main__':
     unittest.main()
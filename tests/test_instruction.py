@@ -6,6 +6,8 @@ from pydis.instruction import (Instruction, RawInstruction, InstructionAvx, RawI
 from pydis.types import (MachineMode, InstructionEncoding, MaskModes, BroadcastModes, RoundingModes, SwizzleModes,
                          ConversionMode, ExceptionClass, InstructionAttribute)
 from pydis.generate_types import InstructionCategory, ISAExt, ISASet, Mnemonic
+from pydis.classification import MnemonicClass, MnemonicClasses
+from pydis.decoder import decode
 
 
 instruction_format = 'BxHB15sBBBBBBB640sQQ21sx12s4s168sxx'
@@ -126,6 +128,24 @@ class TestInstruction(unittest.TestCase):
 
         self.assertEqual(instruction.mnemonic, 'mov')
 
+    def test_classification(self):
+        def classify(code):
+            instruction = next(decode(code))
+            return [instruction.is_branch, instruction.is_call, instruction.is_ret, instruction.is_conditional,
+                    instruction.is_unconditional_jump, instruction.is_nop, instruction.is_privileged]
+
+        self.assertListEqual(classify(b'\xe8\x00\x00\x00\x00'), [True, True, False, False, False, False, False])
+        self.assertListEqual(classify(b'\xc3'), [True, False, True, False, False, False, False])
+        self.assertListEqual(classify(b'\xe2\xfe'), [True, False, False, True, False, False, False])
+        self.assertListEqual(classify(b'\xeb\xfe'), [True, False, False, False, True, False, False])
+        self.assertListEqual(classify(b'\x0f\x1f\x00'), [False, False, False, False, False, True, False])
+        self.assertListEqual(classify(b'\x0f\x30'), [False, False, False, False, False, False, True])
+        self.assertListEqual(classify(b'\x51'), [False] * 7)
+
+        # mov to a control register is only privileged according to the decoder.
+        self.assertListEqual(classify(b'\x0f\x22\xc0'), [False] * 6 + [True])
+        self.assertFalse(MnemonicClasses[Mnemonic.MOV] & MnemonicClass.Privileged)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import pydis
+from pydis.batch import BatchColumns
+
+
+instructions = b'\x51\x8d\x45\xff\x50\xff\x75\x0c\xff\x75\x08\xff\x15\xa0\xa5\x48\x76\x85\xc0\x0f\x88\xfc\xda\x02\x00'
+instruction_pointer = 0x007FFFFFFF400000
+
+
+class TestParallelDecode(unittest.TestCase):
+    def assertBatchEqual(self, first, second):
+        for name, _ in BatchColumns:
+            self.assertListEqual(list(getattr(first, name)), list(getattr(second, name)), name)
+
+    def test_matches_serial_decode(self):
+        buffer = instructions * 50
+
+        # Chunk sizes that don't line up with the instruction boundaries force every chunk to resynchronize.
+        for chunk_size in (16, 37, 100):
+            batch = pydis.parallel_decode(buffer, instruction_pointer, workers=2, chunk_size=chunk_size)
+            self.assertBatchEqual(batch, pydis.decode_batch(buffer, instruction_pointer))
+
+    def test_machine_mode(self):
+        # Workers create their decoders on demand with the requested mode.
+        buffer = instructions * 50
+        mode = pydis.MachineMode.LongCompat32
+        address_width = pydis.AddressWidth.Width32
+
+        batch = pydis.parallel_decode(buffer, 0x401000, workers=2, mode=mode, address_width=address_width,
+                                      chunk_size=37)
+        self.assertBatchEqual(batch, pydis.decode_batch(buffer, 0x401000, mode=mode, address_width=address_width))
+
+    def test_truncated_buffer(self):
+        buffer = instructions * 10 + instructions[:-1]
+
+        batch = pydis.parallel_decode(buffer, instruction_pointer, workers=2, chunk_size=32)
+        self.assertBatchEqual(batch, pydis.decode_batch(buffer, instruction_pointer))
+
+    def test_decode_error(self):
+        with self.assertRaises(Exception):
+            pydis.parallel_decode(instructions * 10 + b'\xff\xff' + instructions * 10, workers=2, chunk_size=32)
+
+
+if __name__ == '__main__':
+    unittest.main()
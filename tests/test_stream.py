@@ -0,0 +1,112 @@
+import asyncio
+import io
+import os
+import threading
+import unittest
+
+import pydis
+
+
+instructions = b'\x51\x8d\x45\xff\x50\xff\x75\x0c\xff\x75\x08\xff\x15\xa0\xa5\x48\x76\x85\xc0\x0f\x88\xfc\xda\x02\x00'
+instruction_pointer = 0x007FFFFFFF400000
+
+expected = ['push rcx',
+            'lea eax, [rbp-0x01]',
+            'push rax',
+            'push [rbp+0x0C]',
+            'push [rbp+0x08]',
+            'call [0x008000007588A5B1]',
+            'test eax, eax',
+            'js 0x007FFFFFFF42DB15']
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(source, **kwargs):
+    return [str(instruction) async for instruction in pydis.adecode(source, instruction_pointer, **kwargs)]
+
+
+class TestStreamDecoder(unittest.TestCase):
+    def test_feed(self):
+        stream = pydis.StreamDecoder(address=instruction_pointer)
+
+        decoded = []
+        for offset in range(0, len(instructions), 4):
+            decoded.extend(map(str, stream.feed(instructions[offset:offset + 4])))
+            self.assertLess(len(stream.pending), pydis.MaxInstructionLength)
+
+        decoded.extend(map(str, stream.flush()))
+        self.assertListEqual(decoded, expected)
+        self.assertEqual(stream.address, instruction_pointer + len(instructions))
+
+    def test_flush_partial(self):
+        stream = pydis.StreamDecoder(address=instruction_pointer)
+
+        self.assertListEqual(list(map(str, stream.feed(instructions[:-1]))), expected[:-1])
+        self.assertEqual(stream.pending, instructions[19:-1])
+        self.assertListEqual(stream.flush(), [])
+        self.assertEqual(stream.pending, b'')
+
+    def test_decode_stream(self):
+        decoded = pydis.decode_stream(io.BytesIO(instructions), chunk_size=3, address=instruction_pointer)
+        self.assertListEqual(list(map(str, decoded)), expected)
+
+    def test_decode_pipe(self):
+        read_fd, write_fd = os.pipe()
+
+        def writer():
+            with os.fdopen(write_fd, 'wb', buffering=0) as pipe:
+                for offset in range(0, len(instructions), 7):
+                    pipe.write(instructions[offset:offset + 7])
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        with os.fdopen(read_fd, 'rb') as pipe:
+            self.assertListEqual(list(map(str, pydis.decode_stream(pipe, address=instruction_pointer))), expected)
+        thread.join()
+
+
+class TestAsyncDecode(unittest.TestCase):
+    def test_stream_reader(self):
+        async def decode_reader(chunk_size):
+            reader = asyncio.StreamReader()
+            reader.feed_data(instructions)
+            reader.feed_eof()
+            return await collect(reader, chunk_size=chunk_size)
+
+        # Small chunks split most of the instructions across reads.
+        for chunk_size in (1, 2, 5, 1024):
+            self.assertListEqual(run(decode_reader(chunk_size)), expected)
+
+    def test_async_iterable(self):
+        async def chunks():
+            for offset in range(0, len(instructions), 3):
+                yield instructions[offset:offset + 3]
+
+        self.assertListEqual(run(collect(chunks())), expected)
+
+    def test_truncated_stream(self):
+        async def chunks():
+            yield instructions[:10]
+            yield instructions[10:-1]
+
+        # Like pydis.decode a trailing partial instruction is dropped.
+        self.assertListEqual(run(collect(chunks())), expected[:-1])
+
+    def test_decode_error(self):
+        async def chunks():
+            yield instructions[:5]
+            yield b'\xff\xff'
+
+        with self.assertRaises(Exception):
+            run(collect(chunks()))
+
+
+if __name__ == '__main__':
+    unittest.main()